@@ -0,0 +1,194 @@
+#!/usr/bin/python
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                         3D Object Batch Converter                            #
+#                               Version 1.0.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Converts a whole directory (or glob pattern) of models in parallel.
+    Wavefront .obj files are converted with obj2json.py (or obj2json65k.py if
+    --split65k is given), GOCAD .ts files with ts_converter.py.
+"""
+
+import sys
+import os
+import os.path
+import glob
+import traceback
+import multiprocessing
+
+
+# converter module and flags it accepts for every input extension
+converters = {".obj" : ("obj2json", ["bCalccenter", "bFlipxy", "bFlipxz", "bInteger", "bWeld", "bBinary", "bQuantize", "bOptimize", "bCluster", "bCompress", "numlod"]),
+              ".ts"  : ("ts_converter", ["bCalccenter", "bFlipxy", "bFlipxz", "bInteger", "srs", "bCluster", "bCompress", "numlod"])}
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: FIND SOURCES
+#-------------------------------------------------------------------------------
+# source is a directory (searched recursively) or a glob pattern
+def findsources(source):
+    files = []
+    if os.path.isdir(source):
+        for dirname, dirnames, filenames in os.walk(source):
+            for f in filenames:
+                files.append(os.path.join(dirname, f))
+    else:
+        files = glob.glob(source)
+    return sorted([f for f in files if os.path.splitext(f)[1].lower() in converters])
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: CONVERTER FOR
+#-------------------------------------------------------------------------------
+def converterfor(filename, bSplit65k):
+    modulename, flags = converters[os.path.splitext(filename)[1].lower()]
+    if modulename == "obj2json" and bSplit65k:
+        modulename = "obj2json65k"
+    return modulename, flags
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: OUTPUT EXISTS
+#-------------------------------------------------------------------------------
+def outputexists(filename, modulename, options):
+    module = __import__(modulename)
+    if "bBinary" in options:
+        return os.path.isfile(module.outputname(filename, options["bBinary"]))
+    return os.path.isfile(module.outputname(filename))
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: CONVERT FILE (runs in the worker processes)
+#-------------------------------------------------------------------------------
+# Returns (filename, None) on success and (filename, error message) on failure.
+def convertfile(job):
+    filename, modulename, options = job
+    try:
+        module = __import__(modulename)
+        module.convert(filename, **options)
+    except BaseException:
+        return filename, traceback.format_exc()
+    return filename, None
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print('usage:\n')
+        print('--source directory or "pattern*.obj"')
+        print('--jobs n (default: number of cores)')
+        print('--force (also convert files whose output already exists)')
+        print('--failures failures.txt')
+        print('--split65k (use obj2json65k.py for .obj files)')
+        print('--calccenter')
+        print('--flipxy')
+        print('--integer')
+        print('--flipxz')
+        print('--weld')
+        print('--binary')
+        print('--quantize (binary with quantized vertices, for .obj files)')
+        print('--optimize (reorder triangles and vertices for the vertex cache, for .obj files)')
+        print('--cluster (spatial clusters for frustum culling, json only)')
+        print('--compress (also write .gz and .br copies of the output)')
+        print('--srs epsg:21781 (for .ts files)')
+        print('--lod n (number of levels of detail, default: 1)')
+        print('\nexample: batch_convert.py --source models/ --calccenter --jobs 8')
+        sys.exit()
+
+    source = ""
+    failuresfile = "failures.txt"
+    numjobs = multiprocessing.cpu_count()
+    bForce = 0
+    bSplit65k = 0
+    options = {"bCalccenter" : 0, "bFlipxy" : 0, "bFlipxz" : 0, "bInteger" : 0, "bWeld" : 0, "bBinary" : 0, "bQuantize" : 0, "bOptimize" : 0, "bCluster" : 0, "bCompress" : 0, "srs" : None, "numlod" : 1}
+    flags = {"--calccenter" : "bCalccenter", "--flipxy" : "bFlipxy", "--flipxz" : "bFlipxz",
+             "--integer" : "bInteger", "--weld" : "bWeld", "--binary" : "bBinary", "--quantize" : "bQuantize",
+             "--optimize" : "bOptimize", "--cluster" : "bCluster",
+             "--compress" : "bCompress"}
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == '--source' and i+1 < len(sys.argv):
+            i += 1
+            source = sys.argv[i]
+        elif sys.argv[i] == '--jobs' and i+1 < len(sys.argv):
+            i += 1
+            numjobs = int(sys.argv[i])
+        elif sys.argv[i] == '--srs' and i+1 < len(sys.argv):
+            i += 1
+            options["srs"] = sys.argv[i]
+        elif sys.argv[i] == '--lod' and i+1 < len(sys.argv):
+            i += 1
+            options["numlod"] = int(sys.argv[i])
+        elif sys.argv[i] == '--failures' and i+1 < len(sys.argv):
+            i += 1
+            failuresfile = sys.argv[i]
+        elif sys.argv[i] == '--force':
+            bForce = 1
+        elif sys.argv[i] == '--split65k':
+            bSplit65k = 1
+        elif sys.argv[i] in flags:
+            options[flags[sys.argv[i]]] = 1
+        i += 1
+
+    if options["bQuantize"]:
+        options["bBinary"] = 1
+
+    if source == "":
+        print('Error: please specify input directory or pattern using --source parameter')
+        sys.exit()
+
+    jobs = []
+    skipped = 0
+    for filename in findsources(source):
+        modulename, accepted = converterfor(filename, bSplit65k)
+        jobopts = dict([(k, options[k]) for k in accepted])
+        if not bForce and outputexists(filename, modulename, jobopts):
+            skipped += 1
+            continue
+        jobs.append((filename, modulename, jobopts))
+
+    print('Source: ' + source)
+    print(str(len(jobs)) + ' files to convert, ' + str(skipped) + ' skipped (output exists), ' + str(numjobs) + ' jobs')
+
+    failures = []
+    pool = multiprocessing.Pool(max(numjobs, 1))
+    try:
+        for filename, error in pool.imap_unordered(convertfile, jobs):
+            if error is None:
+                print('converted: ' + filename)
+            else:
+                print('FAILED: ' + filename)
+                failures.append((filename, error))
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    pool.join()
+
+    print(str(len(jobs) - len(failures)) + ' converted, ' + str(len(failures)) + ' failed')
+    if len(failures) > 0:
+        g = open(failuresfile, "w")
+        for filename, error in sorted(failures):
+            g.write(filename + "\n" + error + "\n")
+        g.close()
+        print('failures written to ' + failuresfile)
+        sys.exit(1)
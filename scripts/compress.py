@@ -0,0 +1,177 @@
+#!/usr/bin/python
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                           Precompressed Web Files                            #
+#                               Version 1.0.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Writes precompressed copies (file.gz, and file.br if the brotli module is
+    available) next to tiles, models and scripts, for web servers which serve
+    them directly (e.g. nginx gzip_static). Copies newer than their file are
+    up to date and skipped. Used by the converters, the tilers and deploy.py.
+"""
+
+import sys
+import os
+import os.path
+import glob
+import gzip
+import io
+import multiprocessing
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# only files with these extensions and at least minsize bytes are compressed
+compressextensions = [".json", ".bin", ".js", ".html", ".css", ".txt", ".xml", ".svg"]
+minsize = 1024
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: GZIP
+#-------------------------------------------------------------------------------
+# (no file name and time in the header: the same data gives the same bytes)
+def gzipdata(data):
+    buffer = io.BytesIO()
+    f = gzip.GzipFile(filename="", mode="wb", compresslevel=9, fileobj=buffer, mtime=0)
+    f.write(data)
+    f.close()
+    return buffer.getvalue()
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: COMPRESSORS
+#-------------------------------------------------------------------------------
+# (extension, function) of every available compression
+def compressors():
+    result = [(".gz", gzipdata)]
+    if brotli is not None:
+        result.append((".br", lambda data: brotli.compress(data, quality=11)))
+    return result
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: COMPRESSIBLE
+#-------------------------------------------------------------------------------
+def compressible(filename):
+    return os.path.splitext(filename)[1].lower() in compressextensions and os.path.getsize(filename) >= minsize
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: COMPRESS FILE
+#-------------------------------------------------------------------------------
+# Writes the compressed copies of filename which are missing or older than the
+# file. Returns the number of copies written. Files which are not compressible
+# get none (copies of an earlier, larger version are removed).
+def compressfile(filename):
+    if not compressible(filename):
+        removecompressed(filename)
+        return 0
+    data = None
+    written = 0
+    for ext, compress in compressors():
+        if os.path.isfile(filename + ext) and os.path.getmtime(filename + ext) >= os.path.getmtime(filename):
+            continue
+        if data is None:
+            f = open(filename, "rb")
+            data = f.read()
+            f.close()
+        g = open(filename + ext, "wb")
+        g.write(compress(data))
+        g.close()
+        written += 1
+    return written
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: REMOVE COMPRESSED
+#-------------------------------------------------------------------------------
+# removes the compressed copies of a file which no longer exists
+def removecompressed(filename):
+    for ext in [".gz", ".br"]:
+        if os.path.isfile(filename + ext):
+            os.remove(filename + ext)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: FIND FILES
+#-------------------------------------------------------------------------------
+# compressible files of a directory (searched recursively) or glob pattern
+def findfiles(source):
+    files = []
+    if os.path.isdir(source):
+        for dirname, dirnames, filenames in os.walk(source):
+            for f in filenames:
+                files.append(os.path.join(dirname, f))
+    else:
+        files = glob.glob(source)
+    return sorted([f for f in files if os.path.isfile(f) and compressible(f)])
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: COMPRESS FILES
+#-------------------------------------------------------------------------------
+# Compresses the files with the worker processes of pool, returns the number of
+# copies written.
+def compressfiles(filenames, pool):
+    return sum(pool.imap_unordered(compressfile, filenames, 16))
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print('usage:\n')
+        print('--source directory or "pattern*.json"')
+        print('--jobs n (default: number of cores)')
+        print('\nexample: compress.py --source tiles/ --jobs 8')
+        sys.exit()
+
+    source = ""
+    numjobs = multiprocessing.cpu_count()
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == '--source' and i+1 < len(sys.argv):
+            i += 1
+            source = sys.argv[i]
+        elif sys.argv[i] == '--jobs' and i+1 < len(sys.argv):
+            i += 1
+            numjobs = int(sys.argv[i])
+        i += 1
+
+    if source == "":
+        print('Error: please specify input directory or pattern using --source parameter')
+        sys.exit()
+
+    filenames = findfiles(source)
+    print('Source: ' + source)
+    print(str(len(filenames)) + ' files, compression: ' + ", ".join([ext for ext, compress in compressors()]))
+
+    pool = multiprocessing.Pool(max(numjobs, 1))
+    try:
+        written = compressfiles(filenames, pool)
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    pool.join()
+    print(str(written) + ' compressed files written')
@@ -2,13 +2,28 @@
 #!/usr/bin/python
 # Python Script to make an OpenWebGlobe deployment
 # Make sure to compile first before calling this script
+#
+# The deployment is incremental: the manifest in the
+# target holds the content hash of every deployed file.
+# Only changed files are written, files which are no
+# longer part of the deployment are removed.
+#
+# The library is deployed under a name with its content
+# hash (openwebglobe-<version>.<hash>.js) and declared
+# immutable in the headers file, so browsers and CDNs
+# keep it until a new build changes its name.
+#
+# Deployed files get precompressed .gz (and .br) copies,
+# see compress.py.
 #######################################################
 
-import sys
 import os
 import os.path
 import shutil
-import fileinput
+import hashlib
+import json
+import multiprocessing
+from compress import compressfiles, removecompressed
 
 ###############################
 # SETTINGS
@@ -19,6 +34,13 @@ deploy_path = "../../WebSDK/"
 viewer_path = "WebGLViewer/"
 tutorials_path = "tutorials/"
 ###############################
+tutorials_source = "../source/tutorials/"
+bundle_source = "../compiled/owg-optimized.js"
+manifest_name = "deploy_manifest.json"
+headers_name = "_headers"
+url_path = "/" + viewer_path     # url of jstarget on the web server
+bCompress = 1
+###############################
 
 jstarget = deploy_path + viewer_path
 target = deploy_path + viewer_path + tutorials_path
@@ -28,36 +50,171 @@ target = deploy_path + viewer_path + tutorials_path
 line1 = '<script type="text/javascript" src="../../../external/closure-library/closure/goog/base.js"></script>\n'
 line2 = '<script type="text/javascript" src="../../../compiled/deps.js"></script>\n'
 line3 = '<script type="text/javascript">goog.require(\'owg.OpenWebGlobe\');</script>'
-##
-replace = '<script type="text/javascript" src="' + "../../openwebglobe-" + OpenWebGlobe_Version+ ".js" + '"></script>'
+line4 = '<script type="text/javascript" src="../../../compiled/owg-optimized.js"></script>'
+#########################
+immutable = "Cache-Control: public, max-age=31536000, immutable"
+revalidate = "Cache-Control: no-cache"
 #########################
 
-tutorials = []
 
-if (os.path.exists(target)):
-    shutil.rmtree(target)
+#-------------------------------------------------------------------------------
+# FUNCTION: DEPLOYED CONTENT
+#-------------------------------------------------------------------------------
+# content of a source file as it is deployed (.html files use the compiled
+# library instead of the closure sources, replace is its script tag)
+def deployedcontent(source, replace):
+    f = open(source, "rb")
+    data = f.read()
+    f.close()
+    if replace is not None:
+        data = data.replace(line1.encode("ascii"), b"")
+        data = data.replace(line2.encode("ascii"), b"")
+        data = data.replace(line3.encode("ascii"), replace.encode("ascii"))
+        data = data.replace(line4.encode("ascii"), replace.encode("ascii"))
+    return data
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: DEPLOY FILE (runs in the worker processes)
+#-------------------------------------------------------------------------------
+# Writes the file unless the deployed copy has the same hash. Returns its path
+# (relative to jstarget), hash and whether it was written.
+def deployfile(job):
+    source, relpath, replace, oldhash = job
+    data = deployedcontent(source, replace)
+    digest = hashlib.sha1(data).hexdigest()
+    destination = jstarget + relpath
+    if digest == oldhash and os.path.isfile(destination):
+        return relpath, digest, 0
+    directory = os.path.dirname(destination)
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass   #created by another worker
+    g = open(destination, "wb")
+    g.write(data)
+    g.close()
+    return relpath, digest, 1
 
-shutil.copytree("../source/tutorials/", target, False, None)
-shutil.copy("../compiled/owg-optimized.js", jstarget + "openwebglobe-" + OpenWebGlobe_Version+ ".js")
 
-for dirname, dirnames, filenames in os.walk(target):
-    for subdirname in dirnames:
-        tutorials.append(subdirname)
+#-------------------------------------------------------------------------------
+# FUNCTION: BUNDLE NAME
+#-------------------------------------------------------------------------------
+# fingerprinted name of the library: openwebglobe-<version>.<hash>.js
+def bundlename():
+    f = open(bundle_source, "rb")
+    digest = hashlib.sha1(f.read()).hexdigest()
+    f.close()
+    return "openwebglobe-" + OpenWebGlobe_Version + "." + digest[:12] + ".js"
 
 
-for x in tutorials:
-    for dirname, dirnames, filenames in os.walk(target+x):
+#-------------------------------------------------------------------------------
+# FUNCTION: SOURCE FILES
+#-------------------------------------------------------------------------------
+# (source, path relative to jstarget, script tag for .html files or None) of
+# every deployed file
+def sourcefiles(bundle):
+    replace = '<script type="text/javascript" src="' + "../../" + bundle + '"></script>'
+    files = []
+    for dirname, dirnames, filenames in os.walk(tutorials_source):
         for f in filenames:
-            thefile = target+x+'/'+f
-            filename, ext = os.path.splitext(thefile)
-            if (ext == ".html"):
-                print "processing " + f
-                for line in fileinput.FileInput(thefile,inplace=1):
-                    line = line.replace(line1,"")
-                    line = line.replace(line2,"")
-                    line = line.replace(line3,replace)
-                    #print line
-                    sys.stdout.write(line)
+            source = os.path.join(dirname, f)
+            relpath = tutorials_path + os.path.relpath(source, tutorials_source).replace(os.sep, "/")
+            files.append((source, relpath, replace if os.path.splitext(f)[1] == ".html" else None))
+    files.append((bundle_source, bundle, None))
+    return sorted(files)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: READ MANIFEST
+#-------------------------------------------------------------------------------
+# path -> hash of the last deployment, None if there is none
+def readmanifest():
+    if not os.path.isfile(jstarget + manifest_name):
+        return None
+    f = open(jstarget + manifest_name, "r")
+    manifest = json.load(f)
+    f.close()
+    return manifest
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: REMOVE STALE
+#-------------------------------------------------------------------------------
+# removes a deployed file and the directories it leaves empty
+def removestale(relpath):
+    destination = jstarget + relpath
+    if os.path.isfile(destination):
+        os.remove(destination)
+    removecompressed(destination)
+    directory = os.path.dirname(destination)
+    while os.path.normpath(directory) != os.path.normpath(jstarget) and os.path.isdir(directory) and not os.listdir(directory):
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WRITE HEADERS
+#-------------------------------------------------------------------------------
+# Writes the headers file (one url, then its indented headers): fingerprinted
+# files are immutable, the tutorials have to be revalidated. The file is only
+# written if it changed.
+def writeheaders(bundle):
+    text = url_path + bundle + "\n  " + immutable + "\n"
+    text += url_path + tutorials_path + "*\n  " + revalidate + "\n"
+    if os.path.isfile(jstarget + headers_name):
+        f = open(jstarget + headers_name, "r")
+        bChanged = f.read() != text
+        f.close()
+        if not bChanged:
+            return
+    g = open(jstarget + headers_name, "w")
+    g.write(text)
+    g.close()
+    print("deployed " + headers_name)
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+    manifest = readmanifest()
+    if manifest is None:
+        #first incremental deployment: start from an empty target
+        manifest = {}
+        if (os.path.exists(target)):
+            shutil.rmtree(target)
+
+    bundle = bundlename()
+    print("library: " + bundle)
+    jobs = [(source, relpath, replace, manifest.get(relpath)) for source, relpath, replace in sourcefiles(bundle)]
+    deployed = {}
+    written = 0
+    pool = multiprocessing.Pool()
+    try:
+        for relpath, digest, bWritten in pool.imap_unordered(deployfile, jobs, 8):
+            deployed[relpath] = digest
+            if bWritten:
+                print("deployed " + relpath)
+                written += 1
+        if bCompress:
+            filenames = [jstarget + relpath for relpath in sorted(deployed)]
+            print(str(compressfiles(filenames, pool)) + " compressed files written")
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    pool.join()
 
+    stale = sorted([relpath for relpath in manifest if relpath not in deployed])
+    for relpath in stale:
+        print("removing " + relpath)
+        removestale(relpath)
 
+    writeheaders(bundle)
+    g = open(jstarget + manifest_name, "w")
+    json.dump(deployed, g, indent=1, sort_keys=True)
+    g.close()
 
+    print(str(written) + " of " + str(len(deployed)) + " files written, " + str(len(stale)) + " removed")
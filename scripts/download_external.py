@@ -1,42 +1,301 @@
 #!/usr/bin/python
+"""
+   Downloads and extracts the external libraries (closure library, compiler,
+   ...) to WebViewer/external.
+
+   The archive is streamed to external.tar.gz.part and extracted while it is
+   downloaded. An interrupted download is resumed (HTTP Range) by the next
+   run. The archive is only renamed to external.tar.gz (and the extracted
+   files moved into place) after its SHA-256 matched the pinned digest
+   (sha256 setting or --sha256).
+
+   Without a pinned digest the first verified download is trusted: its digest
+   is recorded in external.tar.gz.sha256 next to the archive and every later
+   download (and the archive in a mirror) must match it. --insecure skips
+   every check.
+
+   With --mirror the archive is kept in (and downloaded once to) a shared
+   directory, for example on CI nodes.
+"""
 
-import urllib2
 import sys
 import os
 import os.path
+import shutil
+import hashlib
 import tarfile
+try:
+   from urllib.request import urlopen, Request
+   from urllib.error import HTTPError
+except ImportError:
+   from urllib2 import urlopen, Request, HTTPError
+
+
+###############################
+# SETTINGS
+###############################
+url = "https://github.com/downloads/OpenWebGlobe/WebViewer/external.tar.gz"
+destfile = "external.tar.gz"
+# pinned SHA-256 (hex) of the archive. If it is None the digest of the first
+# download is recorded (destfile + ".sha256") and checked from then on.
+sha256 = None
+extractdir = "../"
+chunksize = 1 << 16
+###############################
+
+
+#-------------------------------------------------------------------------------
+# CLASS: HASHING READER
+#-------------------------------------------------------------------------------
+# Reads from the http response, writes everything read to diskfile and hashes
+# it, so the download can be extracted while it is written.
+class HashingReader(object):
+   def __init__(self, response, diskfile, digest):
+      self.response = response
+      self.diskfile = diskfile
+      self.digest = digest
+      self.size = 0
+
+   def read(self, size=chunksize):
+      data = self.response.read(size)
+      self.diskfile.write(data)
+      self.digest.update(data)
+      self.size += len(data)
+      return data
+
+   # reads the rest of the response (after the end of the tar archive)
+   def drain(self):
+      while len(self.read(chunksize)) > 0:
+         pass
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: HASH FILE
+#-------------------------------------------------------------------------------
+def hashfile(filename, digest=None):
+   digest = digest or hashlib.sha256()
+   f = open(filename, "rb")
+   data = f.read(chunksize)
+   while len(data) > 0:
+      digest.update(data)
+      data = f.read(chunksize)
+   f.close()
+   return digest
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: VERIFY
+#-------------------------------------------------------------------------------
+# pinned is None for the first download without a pinned digest and with
+# --insecure
+def verify(hexdigest, pinned):
+   if pinned is None:
+      print("sha256 " + hexdigest + " (not checked)")
+      return True
+   return hexdigest.lower() == pinned.lower()
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: READ DIGEST
+#-------------------------------------------------------------------------------
+# the digest recorded in filename, None if there is none
+def readdigest(filename):
+   if not os.path.isfile(filename):
+      return None
+   f = open(filename, "r")
+   hexdigest = f.read().strip()
+   f.close()
+   return hexdigest or None
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: EXTRACT
+#-------------------------------------------------------------------------------
+# Extracts the tar stream fileobj member by member (mode "r|gz": no seeking).
+# Members with absolute paths or ".." are refused.
+def extract(fileobj, directory):
+   tar = tarfile.open(fileobj=fileobj, mode="r|gz")
+   for member in tar:
+      name = os.path.normpath(member.name)
+      if os.path.isabs(name) or name.split(os.sep)[0] == "..":
+         raise IOError("refusing to extract " + member.name)
+      tar.extract(member, directory)
+   tar.close()
 
 
 #-------------------------------------------------------------------------------
 # FUNCTION: DOWNLOAD FILE
 #-------------------------------------------------------------------------------
-def download(url, filename):
-   print "Fetching " + url
-   webfile = urllib2.urlopen(url)
-   diskfile = open(filename,"wb")
-   diskfile.write(webfile.read())
-   diskfile.close()
-   webfile.close()
-   
+# Downloads url to filename + ".part", resuming a previous part. If extractto
+# is given and the download starts from the beginning, the archive is extracted
+# there while it is downloaded. Returns the hex SHA-256 of the whole file and
+# whether it was extracted.
+def download(url, filename, extractto=None):
+   print("Fetching " + url)
+   part = filename + ".part"
+   offset = 0
+   if os.path.isfile(part):
+      offset = os.path.getsize(part)
+   request = Request(url)
+   if offset > 0:
+      request.add_header("Range", "bytes=" + str(offset) + "-")
+   try:
+      response = urlopen(request)
+   except HTTPError as e:
+      if e.code != 416 or offset == 0:
+         raise
+      return hashfile(part).hexdigest(), False   # range not satisfiable: the part is complete
+
+   if offset > 0 and response.getcode() == 206:
+      print("resuming at " + str(offset) + " bytes")
+      digest = hashfile(part)
+      diskfile = open(part, "ab")
+   else:
+      offset = 0
+      digest = hashlib.sha256()
+      diskfile = open(part, "wb")
+   reader = HashingReader(response, diskfile, digest)
+   bExtracted = False
+   try:
+      if extractto is not None and offset == 0:
+         print("Extracting external files...")
+         extract(reader, extractto)
+         reader.drain()
+         bExtracted = True
+      else:
+         reader.drain()
+   finally:
+      diskfile.close()
+      response.close()
+   print(str(offset + reader.size) + " bytes")
+   return digest.hexdigest(), bExtracted
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: INSTALL
+#-------------------------------------------------------------------------------
+# moves the extracted files from the temporary directory into directory
+def install(tempdir, directory):
+   for name in os.listdir(tempdir):
+      target = os.path.join(directory, name)
+      if os.path.isdir(target) and not os.path.islink(target):
+         shutil.rmtree(target)
+      elif os.path.lexists(target):
+         os.remove(target)
+      shutil.move(os.path.join(tempdir, name), target)
+   os.rmdir(tempdir)
+
 
 #-------------------------------------------------------------------------------
 # MAIN
 #-------------------------------------------------------------------------------
-destfile = "external.tar.gz"
+if __name__ == "__main__":
+   mirror = None
+   bForce = 0
+   bInsecure = 0
 
-#check if file was downloaded before.
-if (os.path.isfile(destfile)):
-   print "File already downloaded..."
-else:
-   download("https://github.com/downloads/OpenWebGlobe/WebViewer/external.tar.gz", destfile)
-   # extract archive in "WebViewer/external"
-   print "Extracting external files..." 
-   tar = tarfile.open(destfile)
-   tar.extractall("../")
-   tar.close()
-   print "Ok."
+   i = 1
+   while i < len(sys.argv):
+      if sys.argv[i] == '--mirror' and i+1 < len(sys.argv):
+         i += 1
+         mirror = sys.argv[i]
+      elif sys.argv[i] == '--url' and i+1 < len(sys.argv):
+         i += 1
+         url = sys.argv[i]
+      elif sys.argv[i] == '--sha256' and i+1 < len(sys.argv):
+         i += 1
+         sha256 = sys.argv[i]
+      elif sys.argv[i] == '--force':
+         bForce = 1
+      elif sys.argv[i] == '--insecure':
+         bInsecure = 1
+      elif sys.argv[i] in ['--help', '-h']:
+         print('usage:\n')
+         print('--mirror directory (keep the archive in this directory, download it only once)')
+         print('--url url (default: ' + url + ')')
+         print('--sha256 digest (expected SHA-256 of the archive)')
+         print('--force (extract again)')
+         print('--insecure (do not check the sha256, not even a recorded one)')
+         sys.exit()
+      i += 1
+
+   archive = destfile
+   if mirror is not None:
+      if not os.path.isdir(mirror):
+         os.makedirs(mirror)
+      archive = os.path.join(mirror, destfile)
+   recorded = archive + ".sha256"      # digest trusted on first use
+   pinned = sha256
+   if bInsecure:
+      pinned = None
+      print("--insecure: the sha256 of the archive is not checked")
+   elif pinned is None:
+      pinned = readdigest(recorded)
+      if pinned is None:
+         print("Warning: no pinned sha256, the digest of this download is recorded in " + recorded)
+         print("and checked from now on (set sha256 in download_external.py or use --sha256)")
+   marker = destfile + ".extracted"    # digest of the archive extracted last
+   tempdir = os.path.join(extractdir, ".external.tmp")
+   if os.path.isdir(tempdir):
+      shutil.rmtree(tempdir)
+
+   #check if file was downloaded before.
+   hexdigest = None
+   if os.path.isfile(archive):
+      hexdigest = hashfile(archive).hexdigest()
+      if verify(hexdigest, pinned):
+         print("File already downloaded...")
+      else:
+         print("checksum mismatch, downloading again: " + archive)
+         os.remove(archive)
+         hexdigest = None
 
-print "Done."
+   bExtracted = False
+   if hexdigest is None:
+      os.makedirs(tempdir)
+      try:
+         hexdigest, bExtracted = download(url, archive, tempdir)
+      except Exception as e:
+         print("Error: download failed (" + str(e) + "), run again to resume")
+         sys.exit(1)
+      if not verify(hexdigest, pinned):
+         os.remove(archive + ".part")
+         shutil.rmtree(tempdir)
+         print("Error: checksum mismatch (sha256 " + hexdigest + "), the download was removed")
+         print("if the archive was updated, pin its digest with --sha256 digest")
+         sys.exit(1)
+      if os.path.isfile(archive):
+         os.remove(archive)
+      os.rename(archive + ".part", archive)
+      if bExtracted:
+         install(tempdir, extractdir)
+      else:
+         shutil.rmtree(tempdir)
 
+   if not bInsecure and readdigest(recorded) != hexdigest:
+      #the verified digest (pinned or trusted on first use)
+      g = open(recorded, "w")
+      g.write(hexdigest + "\n")
+      g.close()
 
+   extracted = None
+   if os.path.isfile(marker):
+      f = open(marker, "r")
+      extracted = f.read().strip()
+      f.close()
+   if not bExtracted and (bForce or extracted != hexdigest):
+      # extract archive in "WebViewer/external"
+      print("Extracting external files...")
+      os.makedirs(tempdir)
+      f = open(archive, "rb")
+      extract(f, tempdir)
+      f.close()
+      install(tempdir, extractdir)
+      bExtracted = True
+   if bExtracted:
+      g = open(marker, "w")
+      g.write(hexdigest + "\n")
+      g.close()
+      print("Ok.")
 
+   print("Done.")
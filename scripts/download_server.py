@@ -0,0 +1,151 @@
+#!/usr/bin/python
+"""
+   Local HTTP stand-in for the download server of download_external.py.
+
+   Serves one file with Range support (206 Partial Content, 416 for a range
+   starting at or after its end). The first dropcount requests with a body are
+   cut off after dropafter bytes, to test resuming an interrupted download.
+   Every request is recorded as (path, range header, status).
+
+   Used by test_download_external.py, or run it to serve a file by hand:
+   download_server.py --source external.tar.gz --port 8000 --dropafter 100000
+"""
+
+import sys
+import os.path
+import re
+import threading
+try:
+   from http.server import BaseHTTPRequestHandler, HTTPServer
+   from socketserver import ThreadingMixIn
+except ImportError:
+   from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+   from SocketServer import ThreadingMixIn
+
+
+#-------------------------------------------------------------------------------
+# CLASS: REQUEST HANDLER
+#-------------------------------------------------------------------------------
+class RangeHandler(BaseHTTPRequestHandler):
+   def do_GET(self):
+      server = self.server
+      data = server.data
+      if self.path != server.path:
+         self.reply(404, None)
+         return
+      header = self.headers.get("Range")
+      start = 0
+      end = len(data)
+      status = 200
+      if header is not None:
+         m = re.match(r"bytes=(\d+)-(\d*)$", header)
+         start = int(m.group(1))
+         if m.group(2):
+            end = min(int(m.group(2)) + 1, len(data))
+         if start >= len(data):
+            self.reply(416, header)
+            return
+         status = 206
+      body = data[start:end]
+      self.send_response(status)
+      self.send_header("Content-Type", "application/octet-stream")
+      self.send_header("Content-Length", str(len(body)))
+      self.send_header("Accept-Ranges", "bytes")
+      if status == 206:
+         self.send_header("Content-Range", "bytes " + str(start) + "-" + str(end - 1) + "/" + str(len(data)))
+      self.end_headers()
+      server.record(self.path, header, status)
+      with server.lock:
+         bDrop = server.dropcount > 0
+         if bDrop:
+            server.dropcount -= 1
+      if bDrop:
+         self.wfile.write(body[:server.dropafter])
+         self.wfile.flush()
+         self.close_connection = True
+         self.connection.shutdown(2)   # cut off: the client sees a short body
+      else:
+         self.wfile.write(body)
+
+   def reply(self, status, header):
+      self.send_response(status)
+      self.send_header("Content-Length", "0")
+      self.end_headers()
+      self.server.record(self.path, header, status)
+
+   def log_message(self, format, *args):
+      pass
+
+
+#-------------------------------------------------------------------------------
+# CLASS: STAND-IN SERVER
+#-------------------------------------------------------------------------------
+class StandInServer(ThreadingMixIn, HTTPServer):
+   daemon_threads = True
+
+   def __init__(self, data, path="/external.tar.gz", port=0, dropcount=0, dropafter=0):
+      HTTPServer.__init__(self, ("127.0.0.1", port), RangeHandler)
+      self.data = data
+      self.path = path
+      self.dropcount = dropcount
+      self.dropafter = dropafter
+      self.requests = []
+      self.lock = threading.Lock()
+      self.thread = None
+
+   def record(self, path, header, status):
+      with self.lock:
+         self.requests.append((path, header, status))
+
+   def url(self):
+      return "http://127.0.0.1:" + str(self.server_address[1]) + self.path
+
+   def start(self):
+      self.thread = threading.Thread(target=self.serve_forever)
+      self.thread.daemon = True
+      self.thread.start()
+
+   def stop(self):
+      self.shutdown()
+      self.server_close()
+      self.thread.join()
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+   source = ""
+   port = 8000
+   dropcount = 0
+   dropafter = 0
+
+   i = 1
+   while i < len(sys.argv):
+      if sys.argv[i] == '--source' and i+1 < len(sys.argv):
+         i += 1
+         source = sys.argv[i]
+      elif sys.argv[i] == '--port' and i+1 < len(sys.argv):
+         i += 1
+         port = int(sys.argv[i])
+      elif sys.argv[i] == '--dropafter' and i+1 < len(sys.argv):
+         i += 1
+         dropafter = int(sys.argv[i])
+         dropcount = 1
+      i += 1
+
+   if source == "":
+      print('usage:\n')
+      print('--source file')
+      print('--port n (default: 8000)')
+      print('--dropafter n (cut off the first download after n bytes)')
+      sys.exit()
+
+   f = open(source, "rb")
+   server = StandInServer(f.read(), "/" + os.path.basename(source), port, dropcount, dropafter)
+   f.close()
+   print("serving " + server.url())
+   try:
+      server.serve_forever()
+   except KeyboardInterrupt:
+      server.server_close()
@@ -0,0 +1,227 @@
+#!/usr/bin/python
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                         Elevation Tile Generator                             #
+#                               Version 1.0.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Writes the tile pyramid of an owg elevation layer from a digital elevation
+    model (raw grid with ENVI header, e.g. "gdal_translate -of ENVI"):
+
+        output/layer/tiles/lod/x/y.json
+        output/layer/layersettings.json
+
+    With --archive the tiles are written into one archive
+    output/layer/tiles.owgt instead of the tile tree, to copy the layer to a
+    server, where "tile_archive.py --unpack" writes the tile tree. The viewer
+    reads the tile tree only.
+
+    Add the layer with {"service" : "owg", "url" : ["http://server/output"],
+    "layer" : "layer"}.
+"""
+
+import sys
+import os
+import os.path
+import json
+import shutil
+import tempfile
+import multiprocessing
+from compress import findfiles, compressfiles
+from owgconverter import Dem, buildelevationtile, wgs84totilecoord
+from owgconverter import TileArchiveWriter
+
+
+dem = None   #elevation model of the worker process
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: OPEN DEM (initializer of the worker processes)
+#-------------------------------------------------------------------------------
+def opendem(filename, srs, cachedir):
+    global dem
+    dem = Dem(filename, srs)
+    dem.openoverviews(cachedir)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE JOB (runs in the worker processes)
+#-------------------------------------------------------------------------------
+# Writes the tile to output/lod/x/y.json or, if output is None, returns it for
+# the tile archive.
+def tilejob(job):
+    output, lod, tx, ty, gridsize = job
+    if output is None:
+        return lod, tx, ty, buildelevationtile(dem, lod, tx, ty, None, gridsize)
+    dirname = os.path.join(output, str(lod), str(tx))
+    try:
+        os.makedirs(dirname)
+    except OSError:
+        if not os.path.isdir(dirname):
+            raise
+    buildelevationtile(dem, lod, tx, ty, os.path.join(dirname, str(ty) + ".json"), gridsize)
+    return lod, tx, ty, None
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE RANGE
+#-------------------------------------------------------------------------------
+# Returns the tile extent [x0, y0, x1, y1] of the bounds at level lod.
+def tilerange(bounds, lod):
+    lngmin, latmin, lngmax, latmax = bounds
+    tx, ty = wgs84totilecoord([lngmin, lngmax], [latmax, latmin], lod)
+    return [int(tx[0]), int(ty[0]), int(tx[1]), int(ty[1])]
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE JOBS
+#-------------------------------------------------------------------------------
+def tilejobs(bounds, output, minlod, maxlod, gridsize):
+    for lod in range(minlod, maxlod+1):
+        x0, y0, x1, y1 = tilerange(bounds, lod)
+        for tx in range(x0, x1+1):
+            for ty in range(y0, y1+1):
+                yield output, lod, tx, ty, gridsize
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE
+#-------------------------------------------------------------------------------
+def tile(filename, output, layer, minlod, maxlod, gridsize=17, srs=None, numjobs=None, bCompress=0, bArchive=0):
+    numjobs = max(numjobs or multiprocessing.cpu_count(), 1)
+    layerdir = os.path.join(output, layer)
+    tilesdir = os.path.join(layerdir, "tiles") if not bArchive else None
+    cachedir = tempfile.mkdtemp(prefix="owgdem")
+    try:
+        source = Dem(filename, srs)
+        bounds = source.bounds()
+        source.buildoverviews(cachedir)
+        print('Bounds: ' + ", ".join([str(c) for c in bounds]) + ' (' + str(len(source.overviews)-1) + ' overviews)')
+
+        if not os.path.isdir(layerdir):
+            os.makedirs(layerdir)
+        writer = TileArchiveWriter(os.path.join(layerdir, "tiles.owgt"), "json") if bArchive else None
+        pool = multiprocessing.Pool(numjobs, opendem, (filename, srs, cachedir))
+        try:
+            numtiles = 0
+            for lod, tx, ty, data in pool.imap_unordered(tilejob, tilejobs(bounds, tilesdir, minlod, maxlod, gridsize), 16):
+                if writer is not None:
+                    writer.add(lod, tx, ty, data.encode("utf-8"))
+                numtiles += 1
+            if writer is not None:
+                writer.close()
+                print(str(numtiles) + ' tiles written to tiles.owgt')
+            else:
+                print(str(numtiles) + ' tiles written')
+            if bCompress:
+                print(str(compressfiles(findfiles(tilesdir), pool)) + ' compressed files written')
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    finally:
+        shutil.rmtree(cachedir)
+
+    settings = {"name" : layer, "type" : "elevation", "format" : "json", "maxlod" : maxlod, "extent" : tilerange(bounds, maxlod)}
+    g = open(os.path.join(layerdir, "layersettings.json"), "w")
+    json.dump(settings, g)
+    g.close()
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print('usage:\n')
+        print('--source dem.raw (with ENVI header dem.hdr)')
+        print('--output directory')
+        print('--layer name')
+        print('--minlod n (default: 1)')
+        print('--maxlod n')
+        print('--gridsize n (vertices per tile side, default: 17)')
+        print('--srs epsg:21781 (if the dem is projected and its header has no coordinate system string)')
+        print('--compress (also write .gz and .br copies of the tiles)')
+        print('--archive (write the tiles into one archive tiles.owgt instead, unpack it with tile_archive.py)')
+        print('--jobs n (default: number of cores)')
+        print('\nexample: elevation_tiler.py --source dem.raw --output tiles --layer dhm25 --maxlod 14')
+        sys.exit()
+
+    source = ""
+    output = ""
+    layer = ""
+    minlod = 1
+    maxlod = -1
+    gridsize = 17
+    srs = None
+    numjobs = None
+    bCompress = 0
+    bArchive = 0
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == '--source' and i+1 < len(sys.argv):
+            i += 1
+            source = sys.argv[i]
+        elif sys.argv[i] == '--output' and i+1 < len(sys.argv):
+            i += 1
+            output = sys.argv[i]
+        elif sys.argv[i] == '--layer' and i+1 < len(sys.argv):
+            i += 1
+            layer = sys.argv[i]
+        elif sys.argv[i] == '--minlod' and i+1 < len(sys.argv):
+            i += 1
+            minlod = int(sys.argv[i])
+        elif sys.argv[i] == '--maxlod' and i+1 < len(sys.argv):
+            i += 1
+            maxlod = int(sys.argv[i])
+        elif sys.argv[i] == '--gridsize' and i+1 < len(sys.argv):
+            i += 1
+            gridsize = int(sys.argv[i])
+        elif sys.argv[i] == '--srs' and i+1 < len(sys.argv):
+            i += 1
+            srs = sys.argv[i]
+        elif sys.argv[i] == '--jobs' and i+1 < len(sys.argv):
+            i += 1
+            numjobs = int(sys.argv[i])
+        elif sys.argv[i] == '--compress':
+            bCompress = 1
+        elif sys.argv[i] == '--archive':
+            bArchive = 1
+        i += 1
+
+    if source == "" or output == "" or layer == "" or maxlod < 0:
+        print('Error: please specify --source, --output, --layer and --maxlod')
+        sys.exit()
+
+    if minlod < 1 or minlod > maxlod or maxlod > 30 or gridsize < 2:
+        print('Error: 1 <= minlod <= maxlod <= 30 and gridsize >= 2')
+        sys.exit()
+
+    print('Source: ' + source)
+    print('Output: ' + os.path.join(output, layer) + ', lod ' + str(minlod) + ' to ' + str(maxlod))
+
+    if bArchive and bCompress:
+        print('--compress is ignored with --archive')
+        bCompress = 0
+
+    tile(source, output, layer, minlod, maxlod, gridsize, srs, numjobs, bCompress, bArchive)
+
+    print("tiling successfully finished...")
@@ -0,0 +1,230 @@
+#!/usr/bin/python
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                             3D Geometry Tiler                                #
+#                               Version 1.0.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Writes converted json geometry (obj2json.py, ts_converter.py, ...) into the
+    tile pyramid of an owg geometry layer:
+
+        output/layer/tiles/lod/x/y.json
+        output/layer/layersettings.json
+
+    With --archive the tiles are written into one archive
+    output/layer/tiles.owgt instead of the tile tree, to copy the layer to a
+    server, where "tile_archive.py --unpack" writes the tile tree. The viewer
+    reads the tile tree only.
+
+    The surfaces must be georeferenced (Center in WGS84). Add the layer with
+    {"service" : "owg", "url" : ["http://server/output"], "layer" : "layer",
+     "minlod" : minlod, "maxlod" : maxlod}.
+"""
+
+import sys
+import os
+import os.path
+import glob
+import json
+import shutil
+import tempfile
+import multiprocessing
+from compress import findfiles, compressfiles
+from owgconverter import Mesh, readsurfaces, cachesurface, tilejobs, buildtile, imapbounded
+from owgconverter import wgs84totilecoord
+from owgconverter import TileArchiveWriter
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: FIND SOURCES
+#-------------------------------------------------------------------------------
+# source is a json file, a directory (searched recursively) or a glob pattern
+def findsources(source):
+    files = []
+    if os.path.isdir(source):
+        for dirname, dirnames, filenames in os.walk(source):
+            for f in filenames:
+                files.append(os.path.join(dirname, f))
+    else:
+        files = glob.glob(source)
+    return sorted([f for f in files if os.path.splitext(f)[1].lower() == ".json"])
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: READ JOBS
+#-------------------------------------------------------------------------------
+# yields (cachefile, text) for all surfaces of all files
+def readjobs(filenames, cachedir):
+    n = 0
+    for filename in filenames:
+        f = open(filename, "r")
+        for layer, text in readsurfaces(f):
+            yield os.path.join(cachedir, str(n)), text
+            n += 1
+        f.close()
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: CACHE JOB (runs in the worker processes)
+#-------------------------------------------------------------------------------
+def cachejob(job):
+    cachefile, text = job
+    return (cachefile,) + cachesurface(Mesh.fromdict(json.loads(text)), cachefile)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE JOB (runs in the worker processes)
+#-------------------------------------------------------------------------------
+# Writes the tile to output/lod/x/y.json or, if output is None, returns it for
+# the tile archive.
+def tilejob(job):
+    output, lod, tx, ty, members = job
+    if output is None:
+        return lod, tx, ty, buildtile(lod, tx, ty, members, None)
+    dirname = os.path.join(output, str(lod), str(tx))
+    try:
+        os.makedirs(dirname)
+    except OSError:
+        if not os.path.isdir(dirname):
+            raise
+    buildtile(lod, tx, ty, members, os.path.join(dirname, str(ty) + ".json"))
+    return lod, tx, ty, None
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE
+#-------------------------------------------------------------------------------
+def tile(filenames, output, layer, minlod, maxlod, numjobs=None, bCompress=0, bArchive=0):
+    numjobs = max(numjobs or multiprocessing.cpu_count(), 1)
+    layerdir = os.path.join(output, layer)
+    if not os.path.isdir(layerdir):
+        os.makedirs(layerdir)
+    tilesdir = os.path.join(layerdir, "tiles") if not bArchive else None
+    writer = TileArchiveWriter(os.path.join(layerdir, "tiles.owgt"), "json") if bArchive else None
+    cachedir = tempfile.mkdtemp(prefix="owgtiler")
+    pool = multiprocessing.Pool(numjobs)
+    try:
+        #pass 1: cache every surface and its simplified versions, build the index
+        records = list(imapbounded(pool, cachejob, readjobs(filenames, cachedir), 2*numjobs))
+        print(str(len(records)) + ' surfaces indexed')
+
+        #pass 2: write the tiles
+        jobs = [(tilesdir, lod, tx, ty, members) for lod, tx, ty, members in tilejobs(records, minlod, maxlod)]
+        numtiles = 0
+        for lod, tx, ty, data in pool.imap_unordered(tilejob, jobs):
+            if writer is not None:
+                writer.add(lod, tx, ty, data.encode("utf-8"))
+            numtiles += 1
+        if writer is not None:
+            writer.close()
+            print(str(numtiles) + ' tiles written to tiles.owgt')
+        else:
+            print(str(numtiles) + ' tiles written')
+        if bCompress:
+            print(str(compressfiles(findfiles(tilesdir), pool)) + ' compressed files written')
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        shutil.rmtree(cachedir)
+
+    #tile extent of the maxlod tiles, like the layersettings of image and elevation layers
+    if len(records) > 0:
+        tx, ty = wgs84totilecoord([r[1] for r in records], [r[2] for r in records], maxlod)
+        extent = [int(tx.min()), int(ty.min()), int(tx.max()), int(ty.max())]
+    else:
+        extent = [0, 0, 0, 0]
+    settings = {"name" : layer, "type" : "geometry", "format" : "json", "minlod" : minlod, "maxlod" : maxlod, "extent" : extent}
+    g = open(os.path.join(layerdir, "layersettings.json"), "w")
+    json.dump(settings, g)
+    g.close()
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print('usage:\n')
+        print('--source file.json, directory or "pattern*.json"')
+        print('--output directory')
+        print('--layer name')
+        print('--minlod n (default: 12)')
+        print('--maxlod n (default: 16)')
+        print('--compress (also write .gz and .br copies of the tiles)')
+        print('--archive (write the tiles into one archive tiles.owgt instead, unpack it with tile_archive.py)')
+        print('--jobs n (default: number of cores)')
+        print('\nexample: geometry_tiler.py --source models/ --output tiles --layer buildings --minlod 12 --maxlod 16')
+        sys.exit()
+
+    source = ""
+    output = ""
+    layer = ""
+    minlod = 12
+    maxlod = 16
+    numjobs = None
+    bCompress = 0
+    bArchive = 0
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == '--source' and i+1 < len(sys.argv):
+            i += 1
+            source = sys.argv[i]
+        elif sys.argv[i] == '--output' and i+1 < len(sys.argv):
+            i += 1
+            output = sys.argv[i]
+        elif sys.argv[i] == '--layer' and i+1 < len(sys.argv):
+            i += 1
+            layer = sys.argv[i]
+        elif sys.argv[i] == '--minlod' and i+1 < len(sys.argv):
+            i += 1
+            minlod = int(sys.argv[i])
+        elif sys.argv[i] == '--maxlod' and i+1 < len(sys.argv):
+            i += 1
+            maxlod = int(sys.argv[i])
+        elif sys.argv[i] == '--jobs' and i+1 < len(sys.argv):
+            i += 1
+            numjobs = int(sys.argv[i])
+        elif sys.argv[i] == '--compress':
+            bCompress = 1
+        elif sys.argv[i] == '--archive':
+            bArchive = 1
+        i += 1
+
+    if source == "" or output == "" or layer == "":
+        print('Error: please specify --source, --output and --layer')
+        sys.exit()
+
+    if minlod < 1 or minlod > maxlod or maxlod > 30:
+        print('Error: 1 <= minlod <= maxlod <= 30')
+        sys.exit()
+
+    filenames = findsources(source)
+    print('Source: ' + source + ' (' + str(len(filenames)) + ' files)')
+    print('Output: ' + os.path.join(output, layer) + ', lod ' + str(minlod) + ' to ' + str(maxlod))
+
+    if bArchive and bCompress:
+        print('--compress is ignored with --archive')
+        bCompress = 0
+
+    tile(filenames, output, layer, minlod, maxlod, numjobs, bCompress, bArchive)
+
+    print("tiling successfully finished...")
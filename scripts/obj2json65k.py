@@ -20,277 +20,169 @@
 #     Licensed under MIT License. Read the file LICENSE for more information   @
 ################################################################################
 
-import urllib2
 import sys
-import os
 import os.path
-import tarfile
-import re
-import glob
-
-
-if len(sys.argv) < 2:
-   print('usage:\n')
-   print('--source wavefront.obj')
-   print('--calccenter')
-   print('--flipxy')
-   print('--integer')
-   print('--flipxz')
-   print('\nexample: obj2json.py --source bla.obj --calccenter')
-   sys.exit()
-   
-
-filename = ""
-bSource = 0
-bCalccenter = 0
-bFlipxy = 0
-bInteger = 0
-bFlipxz = 0
-
-id = 1
-lng = 0
-lat = 0
-elv = 0
-texture = ""
-
-
-   
-for i in range(1,len(sys.argv)):
-    if not(sys.argv[i].startswith('--')):
-      if bSource == 1:
-         filename = sys.argv[i]
-    if sys.argv[i] == ('--source'):
-        bSource = 1
-    if sys.argv[i] == ('--calccenter'):
+from compress import compressfile
+from owgconverter import ConversionError, loadobj, objaxes, transform, lodchain, splitmesh, writejson, writebinarysurface, clustersurfaces, optimizesurfaces
+from owgconverter import tempname, finishoutput
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: OUTPUT NAME
+#-------------------------------------------------------------------------------
+# name of the (first) output file
+def outputname(filename, bBinary=0):
+    if bBinary:
+        return os.path.splitext(filename)[0]+'_0.bin'
+    return os.path.splitext(filename)[0]+'.json'
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: CONVERT
+#-------------------------------------------------------------------------------
+def convert(filename, bCalccenter=0, bFlipxy=0, bFlipxz=0, bInteger=0, bWeld=0, bBinary=0, numlod=1, bQuantize=0, bOptimize=0, bCluster=0, bCompress=0):
+    if bQuantize:
+        #quantized binary surface, positions are always stored relative to the center
         bCalccenter = 1
-    if sys.argv[i] == ('--flipxy'):
-        bFlipxy = 1
-    if sys.argv[i] == ('--integer'):
-        bInteger = 1
-    if sys.argv[i] == ('--flipxz'):
-		  bFlipxz = 1
- 
-if (bSource == 0):
-    print('Error: please specify input file using --source parameter')
-    sys.exit()
-   
-if (bSource):
-    print('Source: ' + filename)
-   
-if (bCalccenter):
-    print('calculating centroid...')
-    
-if (bFlipxy):
-    print('flipping x and y!')
-
-if (bFlipxz):
-    print('flipping x and z!')
- 
-color = ",1,0,0,1" #set color
-
-
-f = open(filename, "r")
-
-#read type p,pt,pnt etc. recognizable on face definition "1"->p "1/2"->pn "1/1/1"->pnt "1//1"->pt
-wholefile = f.read();
-
-wholefile = re.sub("[ ]+"," ",wholefile)
-
-test = re.search("\nf \d*/\d*/\d*",wholefile) # 1/2/1 -> pnt
-if test:
-    vertexsemantic = "pnt"
-
-test1 = re.search("\nf \d*//\d*",wholefile) # 1//1 -> pn
-if test1:
-    vertexsemantic = "pn"
-    print "conversion failed: vertexsemantic 'pn' is currently not supported"
-    quit()
-
-    
-test2 = re.search("\nf \d*/\d* ",wholefile) #1/2 ->pt
-if test2:
-    vertexsemantic = "pt"
-
-test3 = re.search("\nf \d* ",wholefile) # 1 -> p
-if test3:
-    vertexsemantic = "p"
-
-#vertexsemantic is now defined. ------------------------------------------------
-print "vertexsemantic found: "+vertexsemantic
-
-f.seek(0); #sets the file cursor back
-
-#set v ,vn, vt arrays
-lines = f.readlines();
-v = []    #vert coordinates
-vt = []   #texture coordinate
-vn = []   #normal coordinates
-face = []
-vertices = []
-p = []
-pt = []
-pnt = []
-idx = []
-ilb = []
-ilb2 = []
-
-bHasNormals = 0
-if vertexsemantic == "pnt":
-   bHasNormals = 1
-
-#for i in range(0,65000):
-#    ilb.append(" ") #interleaved buffer
-
-cnt = 0
-
-for line in lines:
-    if line[0:2] == "v ":
-        rline = re.sub(r"\s+",",",line[1:-1]) 
-        v.append(rline[1:])
-    
-    elif line[0:3] == "vn ":
-        rline = re.sub(r"\s+",",",line[1:-1]) 
-        vn.append(rline[2:])
-        
-    elif line[0:3] == "vt ":
-        rline = re.sub(r"\s+",",",line[1:-1]) 
-        vt.append(rline[2:])
-        
-    elif line[0:2] == "f ": #face definition
-        vertices = line[2:-1].split() #splits every space
-        for vert in vertices:
-            if vertexsemantic == "p":
-                ilb.append(v[int(vert)-1]+color)
-                idx.append(cnt)
-                cnt = cnt + 1
-                
-            elif vertexsemantic == "pt": #this means f 1/2    
-                a = vert.split('/')
-                ilb.append(v[int(a[0])-1]+","+(vt[int(a[1])-1]))
-                idx.append(cnt)
-                cnt = cnt + 1
-                
-            elif vertexsemantic == "pnt": #this means f 1/2/2  (note in wavefront it is: p/t/n and not pnt!)   
-                a = vert.split('/')
-                ilb.append((v[int(a[0])-1]+","+(vn[int(a[2])-1])+","+(vt[int(a[1])-1])))
-                idx.append(cnt)
-                cnt = cnt + 1
-                
-f.close();
-
-cx = 0;
-cy = 0;
-cz = 0;
-
-
-
-numelems = len(v);
-part = 1.0 / float(numelems)
-print ('Number of elements: ' + str(numelems))
-for c in v:
-    tokens = c.split(',')
-    x = float(tokens[0])
-    y = float(tokens[1])
-    z = float(tokens[2])
-    cx = cx + x * part;
-    cy = cy + y * part;
-    cz = cz + z * part;
-if bInteger:
-   cx = int(cx)
-   cy = int(cy)
-   cz = int(cz)    
-print ('Center = (' + str(cx) + ', ' + str(cy) + ', ' + str(cz))
-lng = cx
-lat = cy
-elv = cz
-#now recreate ilb
-for ilbiterator in ilb:
-    tokens2 = ilbiterator.split(',')
-    if len(tokens2) > 2:
-        if bCalccenter:
-            newx = float(tokens2[0]) - cx
-            newy = float(tokens2[1]) - cy
-            newz = float(tokens2[2]) - cz
-        else:
-            newx = float(tokens2[0])
-            newy = float(tokens2[1])
-            newz = float(tokens2[2])
-        if bFlipxy:
-            s = str(newy) + ',' + str(-newz) + ',' + str(newx)
-			
-        elif bFlipxz:
-				s = str(newz) + ',' + str(newy) + ',' + str(newx)
-        else:        
-            s = str(newx) + ',' + str(newy) + ',' + str(newz)
-        
-        if (bHasNormals):
-            normalx = float(tokens2[3])
-            normaly = float(tokens2[4])
-            normalz = float(tokens2[5])
-            
-            if bFlipxy:
-                s = s + ',' + str(normaly) + ',' + str(-normalz) + ',' + str(normalx)
-            elif bFlipxz:
-			    s = s + ',' + str(normalz) + ',' + str(normaly) + ',' + str(normalx)
-
-            else:        
-                s = s + ',' + str(normalx) + ',' + str(normaly) + ',' + str(normalz)
-            for i in range(6,len(tokens2)):
-                s = s + ','
-                s = s + tokens2[i]
-        else:
-            for i in range(3,len(tokens2)):
-                s = s + ','
-                s = s + tokens2[i]
-        ilb2.append(s)
-ilb = ilb2
-ilb2 = []
-
-k=0;   
-#write to json format
-name = filename.split('.')
-g = open(name[0]+'.json',"w")
-g.write("[")
-while len(ilb)>0:
-	print len(ilb)
-	g.write("[{\n\"id\"  :  \""+str(id)+"\",")
-	g.write("\n\"Center\"  :  ["+str(lng)+","+str(lat)+","+str(elv)+"],")
-	g.write("\n\"DiffuseMap\"  :  \""+str(texture)+"\",")
-	g.write("\n\"VertexSemantic\"  :  \""+vertexsemantic+"\",\n\"Vertices\"  :  [")
-	k=0
-	for x in ilb:
-		k=k+1
-		if(k>65000):
-			break	
-		if(x != " "):
-			g.write("\t"+x+",\n")
-			g.write("\t\t\t\t")
-	
-	for i in range(0,k):
-		ilb.pop(0)
-		
-	g.seek(-7,1) #set cursor pos back to remove last ','
-	g.write("],\n\"IndexSemantic\"  :  \"TRIANGLES\",\n\"Indices\"  :  [\t")
-	i=0
-	for x in idx:
-		i+=1
-		if(i>k):
-			break
-		g.write(str(int(x))+",")
-		if i%3==0:
-			g.write("\n\t\t\t\t")
-			
-	g.seek(-7,1) #set cursor pos back to remove last ','
-	g.write("]}],")
-
-g.seek(-1,1) #set cursor pos back to remove last ','
-g.write("\n\n]")
-
-
-print "conversion successfully finished..."
-
-
-    
-    
-
-
+        bBinary = 1
+    mesh = loadobj(filename, bWeld)
+    order, signs = objaxes(bFlipxy, bFlipxz)
+    transform(mesh, bCalccenter, order, signs, bInteger)
+    print('Center = (' + str(mesh.center[0]) + ', ' + str(mesh.center[1]) + ', ' + str(mesh.center[2]) + ')')
+
+    #every surface holds at most 65535 vertices
+    surfaces = (surface for lod in lodchain(mesh, numlod) for surface in splitmesh(lod))
+    if bCluster:
+        #spatial clusters with bounding boxes, for frustum culling
+        surfaces = clustersurfaces(surfaces)
+    if bOptimize:
+        #reorder triangles and vertices of every surface (cluster) for the vertex cache
+        surfaces = optimizesurfaces(surfaces)
+    if bBinary:
+        if numlod > 1:
+            raise ConversionError("levels of detail are not supported by the binary format")
+        if bCluster:
+            raise ConversionError("clusters are not supported by the binary format")
+        #one binary file per surface, renamed when all surfaces are written
+        name = os.path.splitext(filename)[0]
+        outputs = []
+        bOk = False
+        try:
+            for i, surface in enumerate(surfaces):
+                print('surface ' + str(i) + ': ' + str(len(surface.vertices)) + ' vertices, ' + str(len(surface.indices)//3) + ' triangles')
+                outputs.append(name+'_'+str(i)+'.bin')
+                g = open(tempname(outputs[-1]),"wb")
+                try:
+                    writebinarysurface(g, surface, bQuantize)
+                finally:
+                    g.close()
+            bOk = True
+        finally:
+            finishoutput(outputs, bOk)
+    else:
+        #write to json format, one mesh per surface
+        outputs = [outputname(filename, bBinary)]
+        g = open(tempname(outputs[0]),"w")
+        bOk = False
+        try:
+            writejson(g, ([surface] for surface in surfaces))
+            bOk = True
+        finally:
+            g.close()
+            finishoutput(outputs, bOk)
+    if bCompress:
+        for output in outputs:
+            compressfile(output)
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print('usage:\n')
+        print('--source wavefront.obj')
+        print('--calccenter')
+        print('--flipxy')
+        print('--integer')
+        print('--flipxz')
+        print('--weld')
+        print('--binary')
+        print('--quantize (binary with quantized vertices, relative to the center)')
+        print('--optimize (reorder triangles and vertices for the vertex cache)')
+        print('--cluster (spatial clusters for frustum culling, json only)')
+        print('--compress (also write .gz and .br copies of the output)')
+        print('--lod n (number of levels of detail, default: 1, use with --weld)')
+        print('\nexample: obj2json65k.py --source bla.obj --calccenter')
+        sys.exit()
+
+    filename = ""
+    bSource = 0
+    bCalccenter = 0
+    bFlipxy = 0
+    bInteger = 0
+    bFlipxz = 0
+    bWeld = 0
+    bBinary = 0
+    bQuantize = 0
+    bOptimize = 0
+    bCluster = 0
+    bCompress = 0
+    numlod = 1
+
+    for i in range(1,len(sys.argv)):
+        if not(sys.argv[i].startswith('--')):
+            if sys.argv[i-1] == '--lod':
+                numlod = int(sys.argv[i])
+            elif bSource == 1:
+                filename = sys.argv[i]
+        if sys.argv[i] == ('--source'):
+            bSource = 1
+        if sys.argv[i] == ('--calccenter'):
+            bCalccenter = 1
+        if sys.argv[i] == ('--flipxy'):
+            bFlipxy = 1
+        if sys.argv[i] == ('--integer'):
+            bInteger = 1
+        if sys.argv[i] == ('--flipxz'):
+            bFlipxz = 1
+        if sys.argv[i] == ('--weld'):
+            bWeld = 1
+        if sys.argv[i] == ('--binary'):
+            bBinary = 1
+        if sys.argv[i] == ('--quantize'):
+            bBinary = 1
+            bQuantize = 1
+        if sys.argv[i] == ('--optimize'):
+            bOptimize = 1
+        if sys.argv[i] == ('--cluster'):
+            bCluster = 1
+        if sys.argv[i] == ('--compress'):
+            bCompress = 1
+
+    if (bSource == 0):
+        print('Error: please specify input file using --source parameter')
+        sys.exit()
+
+    if (bSource):
+        print('Source: ' + filename)
+
+    if (bCalccenter):
+        print('calculating centroid...')
+
+    if (bFlipxy):
+        print('flipping x and y!')
+
+    if (bFlipxz):
+        print('flipping x and z!')
+
+    if (numlod > 1):
+        print('creating ' + str(numlod) + ' levels of detail')
+
+    try:
+        convert(filename, bCalccenter, bFlipxy, bFlipxz, bInteger, bWeld, bBinary, numlod, bQuantize, bOptimize, bCluster, bCompress)
+    except ConversionError as e:
+        sys.stderr.write("conversion failed: " + str(e) + "\n")
+        sys.exit(1)
+
+    print("conversion successfully finished...")
@@ -0,0 +1,73 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    OpenWebGlobe converter library.
+
+    The conversion is split into stages that operate on in-memory Mesh objects
+    and can be composed and called from long running processes:
+
+        parse:      obj.loadobj, gocad.parsets, reader.readsurfaces
+        transform:  transform.transform
+        normals:    normals.computenormals
+        simplify:   simplify.lodchain
+        split:      split.splitmesh
+        cluster:    cluster.clustersurfaces
+        optimize:   vertexcache.optimizesurfaces
+        write:      writer.writejson, writer.writebinarysurface,
+                    writer.tempname, writer.finishoutput
+        tile:       tiler.cachesurface, tiler.tilejobs, tiler.buildtile
+        elevation:  dem.Dem, elevation.buildelevationtile
+        points:     pointcloud.pointblock, pointcloud.sortrecords, pointcloud.buildpointtile,
+                    pointcloud.buildparenttile
+        archive:    tilearchive.packtiles, tilearchive.TileArchive
+
+    example:
+
+        from owgconverter import loadobj, objaxes, transform, splitmesh, writejson
+
+        mesh = loadobj("bla.obj", bWeld=1)
+        order, signs = objaxes(bFlipxy=1)
+        transform(mesh, 1, order, signs)
+        g = open("bla.json", "w")
+        writejson(g, [[surface] for surface in splitmesh(mesh)])
+        g.close()
+"""
+
+from .mesh import Mesh, ConversionError, vertexlength
+from .obj import parseobj, weld, objaxes, loadobj
+from .gocad import parsets, tsaxes, reproject, loadts
+from .geodesy import geodetictocartesian, geodetictoenu, geodeticframe, gettransformer
+from .transform import swapaxes, centroid, transform
+from .normals import computenormals
+from .simplify import simplifymesh, simplifychain, lodchain
+from .split import splitmesh
+from .cluster import clustermesh, clustersurfaces
+from .vertexcache import acmr, tipsify, optimizevertexcache, optimizesurfaces
+from .reader import readsurfaces
+from .writer import writesurface, writejson, writebinarysurface, tempname, finishoutput
+from .quadtree import wgs84totilecoord, tilecoordtomorton, mortontotilecoord, tilecoordtoquadkey, quadkeytotilecoord, tilebounds, tilesize
+from .tiler import cachesurface, tilejobs, buildtile
+from .dem import Dem, readenviheader
+from .elevation import elevationtile, writeelevationtile, buildelevationtile
+from .pointcloud import readxyz, readnpy, pointblock, sortrecords, tileranges, writepointcloud, readpointcloud
+from .pointcloud import thinpoints, buildpointtile, buildparenttile
+from .tilearchive import TileArchive, TileArchiveWriter, packtiles, unpacktiles
+from .pool import imapbounded
@@ -0,0 +1,99 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Spatial clusters of a surface for frustum culling in the viewer.
+
+    The triangles are sorted by the Morton order of their centroids and cut
+    into runs using at most maxvertices vertices each. Every cluster is a range
+    of the index array with its bounding box, Surface draws only the clusters
+    inside the view frustum.
+"""
+
+import numpy as np
+
+
+clustersize = 4096   #maximum number of vertices used by a cluster
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: MORTON3
+#-------------------------------------------------------------------------------
+# Interleaves the bits of three arrays of 10 bit integers.
+def morton3(x, y, z):
+    code = np.zeros(len(x), dtype=np.int64)
+    for bit in range(10):
+        code |= ((x >> bit) & 1) << (3*bit)
+        code |= ((y >> bit) & 1) << (3*bit + 1)
+        code |= ((z >> bit) & 1) << (3*bit + 2)
+    return code
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: CLUSTER MESH
+#-------------------------------------------------------------------------------
+# Returns a copy of the mesh with the triangles reordered into clusters and
+# mesh.clusters set: one row per cluster with the first index, the number of
+# indices and the bounding box (min x,y,z, max x,y,z) of its vertices.
+def clustermesh(mesh, maxvertices=clustersize):
+    if mesh.indexsemantic != "TRIANGLES" or len(mesh.indices) == 0:
+        return mesh
+    triangles = np.asarray(mesh.indices, dtype=np.int64).reshape(-1, 3)
+    positions = mesh.positions()
+    centroids = positions[triangles].mean(axis=1)
+    bbmin = centroids.min(axis=0)
+    extent = max(float(np.max(centroids.max(axis=0) - bbmin)), 1e-12)   #cubic cells
+    cells = np.minimum(((centroids - bbmin) / extent * 1024.0).astype(np.int64), 1023)
+    triangles = triangles[np.argsort(morton3(cells[:,0], cells[:,1], cells[:,2]), kind="mergesort")]
+
+    # greedy runs of triangles under the vertex budget
+    starts = [0]
+    used = set()
+    for t, triangle in enumerate(triangles.tolist()):
+        new = [v for v in triangle if v not in used]
+        if len(used) + len(new) > maxvertices:
+            starts.append(t)
+            used = set(triangle)
+        else:
+            used.update(new)
+    starts = np.array(starts, dtype=np.int64)
+    counts = np.diff(np.r_[starts, len(triangles)])
+
+    corners = positions[triangles.reshape(-1)]
+    clusters = np.empty((len(starts), 8))
+    clusters[:,0] = 3 * starts
+    clusters[:,1] = 3 * counts
+    clusters[:,2:5] = np.minimum.reduceat(corners, 3 * starts, axis=0)
+    clusters[:,5:8] = np.maximum.reduceat(corners, 3 * starts, axis=0)
+    mesh = mesh.copy(indices=triangles.reshape(-1))
+    mesh.clusters = clusters
+    return mesh
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: CLUSTER SURFACES
+#-------------------------------------------------------------------------------
+# Generator, clusters the meshes (after splitting) one by one.
+def clustersurfaces(meshes, maxvertices=clustersize):
+    for mesh in meshes:
+        mesh = clustermesh(mesh, maxvertices)
+        if mesh.clusters is not None:
+            print('clusters: ' + str(len(mesh.clusters)))
+        yield mesh
@@ -0,0 +1,221 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Digital elevation models stored as raw grids with an ENVI header.
+
+    The grid is memory mapped and never loaded as a whole. Overviews (2x2 mean
+    of the previous level) are built once as memory mapped files so coarse
+    tiles are sampled from a grid of similar resolution.
+"""
+
+import re
+import os.path
+import math
+import numpy as np
+from .mesh import ConversionError
+from .geodesy import gettransformer
+
+
+# ENVI data type -> numpy type
+envitypes = {1 : "u1", 2 : "i2", 3 : "i4", 4 : "f4", 5 : "f8", 12 : "u2", 13 : "u4", 14 : "i8", 15 : "u8"}
+overviewsize = 256      #no further overviews below this size
+blocklines = 1024       #lines processed at once when building overviews
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: READ ENVI HEADER
+#-------------------------------------------------------------------------------
+# Returns the fields of an ENVI header as a dict with lower case keys and
+# string values ({...} lists without the braces).
+def readenviheader(filename):
+    f = open(filename, "r")
+    text = f.read()
+    f.close()
+    if not text.startswith("ENVI"):
+        raise ConversionError(filename + " is not an ENVI header")
+    header = {}
+    for m in re.finditer(r"^\s*([^=\n]+?)\s*=\s*(\{[^}]*\}|[^\n]*)", text, re.M):
+        value = m.group(2).strip()
+        if value.startswith("{"):
+            value = value[1:-1].strip()
+        header[m.group(1).lower()] = value
+    return header
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: HEADER NAME
+#-------------------------------------------------------------------------------
+# dem.raw -> dem.raw.hdr or dem.hdr
+def headername(filename):
+    for name in [filename + ".hdr", os.path.splitext(filename)[0] + ".hdr"]:
+        if os.path.isfile(name):
+            return name
+    raise ConversionError("no ENVI header (.hdr) found for " + filename)
+
+
+#-------------------------------------------------------------------------------
+# CLASS: DEM
+#-------------------------------------------------------------------------------
+# A single band elevation grid. Positions are given in the srs of the "map info"
+# (Geographic Lat/Lon or projected, then srs or the "coordinate system string"
+# of the header is required). Pixels with the "data ignore value" and positions
+# outside the grid have no elevation (NaN).
+class Dem(object):
+    def __init__(self, filename, srs=None):
+        header = readenviheader(headername(filename))
+        if int(header.get("bands", "1")) != 1:
+            raise ConversionError("only single band elevation models are supported")
+        datatype = int(header["data type"])
+        if datatype not in envitypes:
+            raise ConversionError("unsupported ENVI data type " + str(datatype))
+        dtype = np.dtype(envitypes[datatype]).newbyteorder(">" if header.get("byte order", "0") == "1" else "<")
+        self.width = int(header["samples"])
+        self.height = int(header["lines"])
+        self.data = np.memmap(filename, dtype=dtype, mode="r", offset=int(header.get("header offset", "0")),
+                              shape=(self.height, self.width))
+        self.nodata = float(header["data ignore value"]) if "data ignore value" in header else None
+
+        if "map info" not in header:
+            raise ConversionError("the ENVI header has no map info")
+        mapinfo = [v.strip() for v in header["map info"].split(",")]
+        refx, refy, x0, y0, self.px, self.py = [float(v) for v in mapinfo[1:7]]
+        self.x0 = x0 - (refx - 1.0) * self.px     #upper left corner of the grid
+        self.y0 = y0 + (refy - 1.0) * self.py
+        if mapinfo[0].lower().startswith("geographic"):
+            self.srs = None
+        else:
+            self.srs = srs or header.get("coordinate system string")
+            if not self.srs:
+                raise ConversionError("projected elevation model, please specify its srs")
+        self.overviews = [self.data]
+
+    #---------------------------------------------------------------------------
+    # shapes of the overviews 1, 2, ...
+    def overviewshapes(self):
+        shapes = []
+        height, width = self.height, self.width
+        while max(height, width) > overviewsize:
+            height, width = (height + 1) // 2, (width + 1) // 2
+            shapes.append((height, width))
+        return shapes
+
+    #---------------------------------------------------------------------------
+    # lines start to end of an overview (0: the grid) as float64, NaN if missing
+    def readblock(self, level, start, end):
+        block = np.asarray(self.overviews[level][start:end], dtype=np.float64)
+        if level == 0 and self.nodata is not None:
+            block[block == self.nodata] = np.nan
+        return block
+
+    #---------------------------------------------------------------------------
+    # Builds the overviews as overview<k>.raw (float32) in directory, blockwise.
+    def buildoverviews(self, directory):
+        self.overviews = [self.data]
+        for k, shape in enumerate(self.overviewshapes()):
+            overview = np.memmap(os.path.join(directory, "overview" + str(k+1) + ".raw"), dtype=np.float32, mode="w+", shape=shape)
+            for start in range(0, shape[0], blocklines):
+                end = min(start + blocklines, shape[0])
+                block = self.readblock(k, 2*start, 2*end)
+                if block.shape[0] % 2 == 1:
+                    block = np.vstack((block, block[-1:]))
+                if block.shape[1] % 2 == 1:
+                    block = np.hstack((block, block[:,-1:]))
+                block = block.reshape(block.shape[0]//2, 2, block.shape[1]//2, 2)
+                valid = ~np.isnan(block)
+                count = valid.sum(axis=(1,3))
+                total = np.where(valid, block, 0.0).sum(axis=(1,3))
+                overview[start:end] = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+            overview.flush()
+            del overview
+            self.overviews.append(np.memmap(os.path.join(directory, "overview" + str(k+1) + ".raw"), dtype=np.float32, mode="r", shape=shape))
+
+    #---------------------------------------------------------------------------
+    # Opens overviews built by buildoverviews (in another process).
+    def openoverviews(self, directory):
+        self.overviews = [self.data]
+        for k, shape in enumerate(self.overviewshapes()):
+            self.overviews.append(np.memmap(os.path.join(directory, "overview" + str(k+1) + ".raw"), dtype=np.float32, mode="r", shape=shape))
+
+    #---------------------------------------------------------------------------
+    # WGS84 (arrays) -> continuous pixel coordinates (column, row) of level 0,
+    # pixel centers at integers
+    def pixelcoords(self, lng, lat):
+        if self.srs is None:
+            x, y = lng, lat
+        else:
+            x, y = gettransformer(self.srs, 1)(lng, lat)
+        col = (np.asarray(x) - self.x0) / self.px - 0.5
+        row = (self.y0 - np.asarray(y)) / self.py - 0.5
+        return col, row
+
+    #---------------------------------------------------------------------------
+    # Returns (lngmin, latmin, lngmax, latmax) of the grid.
+    def bounds(self):
+        t = np.linspace(0.0, 1.0, 33)
+        x = np.concatenate((t, t, np.zeros(33), np.ones(33))) * self.width * self.px + self.x0
+        y = self.y0 - np.concatenate((np.zeros(33), np.ones(33), t, t)) * self.height * self.py
+        if self.srs is not None:
+            x, y = gettransformer(self.srs)(x, y)
+        return float(np.min(x)), float(np.min(y)), float(np.max(x)), float(np.max(y))
+
+    #---------------------------------------------------------------------------
+    # approximate width of a pixel of level 0 in meters at latitude lat
+    def pixelsize(self, lat=0.0):
+        if self.srs is None:
+            return self.px * np.pi * 6378137.0 / 180.0 * np.cos(np.radians(lat))
+        return self.px
+
+    #---------------------------------------------------------------------------
+    # Bilinear samples of the elevation at the positions (arrays, WGS84) from
+    # the overview whose pixels are about spacing pixels of level 0 wide.
+    def sample(self, lng, lat, spacing=1.0):
+        col, row = self.pixelcoords(lng, lat)
+        level = 0
+        if spacing > 1.0:
+            level = min(int(math.log(spacing, 2)), len(self.overviews)-1)
+        scale = float(1 << level)
+        col = (col + 0.5) / scale - 0.5
+        row = (row + 0.5) / scale - 0.5
+        grid = self.overviews[level]
+        height, width = grid.shape
+        inside = (col > -0.5) & (col < width - 0.5) & (row > -0.5) & (row < height - 0.5)
+        col = np.clip(col, 0, width - 1)
+        row = np.clip(row, 0, height - 1)
+        c0 = np.minimum(np.floor(col).astype(np.int64), max(width - 2, 0))
+        r0 = np.minimum(np.floor(row).astype(np.int64), max(height - 2, 0))
+        c1 = np.minimum(c0 + 1, width - 1)
+        r1 = np.minimum(r0 + 1, height - 1)
+        fc = col - c0
+        fr = row - r0
+
+        values = np.empty((4,) + np.shape(col))
+        weights = np.empty((4,) + np.shape(col))
+        for k, (r, c, w) in enumerate([(r0, c0, (1-fr)*(1-fc)), (r0, c1, (1-fr)*fc), (r1, c0, fr*(1-fc)), (r1, c1, fr*fc)]):
+            values[k] = grid[r, c]
+            weights[k] = w
+        if level == 0 and self.nodata is not None:
+            values[values == self.nodata] = np.nan
+        missing = np.isnan(values)
+        weights[missing] = 0.0
+        total = weights.sum(axis=0)
+        elevation = np.where(missing, 0.0, values * weights).sum(axis=0) / np.where(total > 0, total, 1.0)
+        elevation[(total <= 0) | ~inside] = np.nan
+        return elevation
@@ -0,0 +1,157 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Elevation tiles of the owg elevation layer (source/core/layer/
+    elevationlayer_owg.js) sampled from a digital elevation model.
+
+    A tile is a regular grid of gridsize x gridsize vertices in the mercator
+    quadtree tile, laid out like the default mesh of the viewer
+    (terrainblock._CreateElevationMesh): rows from north to south, the offset
+    is the north west corner. A skirt (curtain) hangs below the border to hide
+    cracks between tiles of different levels of detail.
+"""
+
+import json
+import numpy as np
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+from .geodesy import geodetictocartesian
+from .quadtree import tilebounds, tilesize
+from .writer import writerows, numberformat
+
+
+cartesianscale = 8388607.0   #CARTESIAN_SCALE of the viewer (mathutils.js)
+gridsize = 17                #vertices per tile side
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: CURTAIN HEIGHT
+#-------------------------------------------------------------------------------
+# depth of the skirt in meters, same as the viewer
+def curtainheight(lod):
+    if lod < 6:
+        return 100000.0
+    return 1000.0
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE GRID
+#-------------------------------------------------------------------------------
+# Returns the (n*n) lng and lat of the tile grid, row by row from north to south.
+# The grid is uniform in mercator coordinates.
+def tilegrid(lod, tx, ty, n=gridsize):
+    lngmin, latmin, lngmax, latmax = tilebounds(tx, ty, lod)
+    ymin = np.log(np.tan(np.pi/4.0 + np.radians(latmin)/2.0))
+    ymax = np.log(np.tan(np.pi/4.0 + np.radians(latmax)/2.0))
+    t = np.linspace(0.0, 1.0, n)
+    lng = np.tile(lngmin + t*(lngmax - lngmin), n)
+    lat = np.repeat(np.degrees(2.0*np.arctan(np.exp(ymax - t*(ymax - ymin))) - np.pi/2.0), n)
+    return lng, lat
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: BORDER RING
+#-------------------------------------------------------------------------------
+# grid indices of the border, first row, last column, last row, first column
+def borderring(n):
+    first = np.arange(0, n-1)
+    right = np.arange(n-1, n*n-1, n)
+    last = np.arange(n*n-1, n*(n-1), -1)
+    left = np.arange(n*(n-1), 0, -n)
+    return np.concatenate((first, right, last, left))
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: GRID INDICES
+#-------------------------------------------------------------------------------
+# Triangles of the grid (same as the viewer) and the skirt, wound like the grid.
+# The skirt vertices are the border ring appended after the n*n grid vertices.
+def gridindices(n):
+    i, j = np.meshgrid(np.arange(n-1), np.arange(n-1))
+    a = (i + j*n).ravel()
+    b = a + 1
+    d = a + n
+    c = d + 1
+    grid = np.column_stack((a, c, d, a, b, c)).ravel()
+    p = borderring(n)
+    q = np.roll(p, -1)
+    pp = n*n + np.arange(len(p))
+    qq = np.roll(pp, -1)
+    skirt = np.column_stack((q, p, pp, q, pp, qq)).ravel()
+    return np.concatenate((grid, skirt))
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: ELEVATION TILE
+#-------------------------------------------------------------------------------
+# Samples the dem for the tile and returns (vertices, indices, offset, bbmin,
+# bbmax). Missing elevations are 0.
+def elevationtile(dem, lod, tx, ty, n=gridsize):
+    lng, lat = tilegrid(lod, tx, ty, n)
+    bounds = tilebounds(tx, ty, lod)
+    lat0 = 0.5*(bounds[1] + bounds[3])
+    elv = dem.sample(lng, lat, tilesize(lod, lat0) / (n - 1) / dem.pixelsize(lat0))
+    elv = np.where(np.isnan(elv), 0.0, elv)
+
+    ring = borderring(n)
+    lng = np.concatenate((lng, lng[ring]))
+    lat = np.concatenate((lat, lat[ring]))
+    elv = np.concatenate((elv, elv[ring] - curtainheight(lod)))
+    positions = np.column_stack(geodetictocartesian(lng, lat, elv)) / cartesianscale
+    offset = positions[0].copy()
+
+    t = np.linspace(0.0, 1.0, n)
+    u = np.tile(t, n)
+    v = 1.0 - np.repeat(t, n)
+    u = np.concatenate((u, u[ring]))
+    v = np.concatenate((v, v[ring]))
+    vertices = np.column_stack((positions - offset, u, v))
+    bbmin = positions[:n*n].min(axis=0)
+    bbmax = positions[:n*n].max(axis=0)
+    return vertices, gridindices(n), offset, bbmin, bbmax
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WRITE ELEVATION TILE
+#-------------------------------------------------------------------------------
+def writeelevationtile(g, vertices, indices, offset, bbmin, bbmax, n=gridsize):
+    g.write("{\n\"VertexSemantic\"  :  \"pt\",\n\"Vertices\"  :  [\t")
+    writerows(g, vertices, numberformat, ",\n\t\t\t\t\t")
+    g.write("],\n\"IndexSemantic\"  :  \"TRIANGLES\",\n\"Indices\"  :  [\t")
+    writerows(g, indices.reshape(-1,3), "%d", ",\n\t\t\t\t")
+    g.write("],\n\"Offset\"  :  ["+",".join([repr(float(c)) for c in offset])+"],")
+    g.write("\n\"BoundingBox\"  :  "+json.dumps([bbmin.tolist(), bbmax.tolist()])+",")
+    g.write("\n\"CurtainIndex\"  :  "+str(n*n)+"\n}")
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: BUILD ELEVATION TILE
+#-------------------------------------------------------------------------------
+# Writes the tile to filename or, if filename is None, returns it as a string
+# (for a tile archive).
+def buildelevationtile(dem, lod, tx, ty, filename, n=gridsize):
+    g = open(filename, "w") if filename is not None else StringIO()
+    writeelevationtile(g, *elevationtile(dem, lod, tx, ty, n), n=n)
+    if filename is None:
+        return g.getvalue()
+    g.close()
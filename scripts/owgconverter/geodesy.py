@@ -0,0 +1,112 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Geodetic helper functions (WGS84) and reprojection.
+"""
+
+import numpy as np
+from .mesh import ConversionError
+
+try:
+    import pyproj
+except ImportError:
+    pyproj = None
+
+
+wgs84_a = 6378137.0
+wgs84_f = 1.0/298.257223563
+wgs84_e2 = wgs84_f * (2.0 - wgs84_f)
+transformers = {}   #(srs, inverse) -> transform function
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: GEODETIC TO CARTESIAN
+#-------------------------------------------------------------------------------
+# lng, lat in degrees, elv in meters (arrays) -> earth centered x, y, z
+def geodetictocartesian(lng, lat, elv):
+    lng = np.radians(lng)
+    lat = np.radians(lat)
+    sinlat = np.sin(lat)
+    n = wgs84_a / np.sqrt(1.0 - wgs84_e2 * sinlat * sinlat)
+    x = (n + elv) * np.cos(lat) * np.cos(lng)
+    y = (n + elv) * np.cos(lat) * np.sin(lng)
+    z = (n * (1.0 - wgs84_e2) + elv) * sinlat
+    return x, y, z
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: GEODETIC TO ENU
+#-------------------------------------------------------------------------------
+# Returns the (n,3) east, north, up coordinates in meters of the geodetic
+# positions relative to the local tangent plane at (lng0, lat0, elv0).
+def geodetictoenu(lng, lat, elv, lng0, lat0, elv0):
+    x, y, z = geodetictocartesian(lng, lat, elv)
+    x0, y0, z0 = geodetictocartesian(lng0, lat0, elv0)
+    dx = x - x0
+    dy = y - y0
+    dz = z - z0
+    sinlng = np.sin(np.radians(lng0))
+    coslng = np.cos(np.radians(lng0))
+    sinlat = np.sin(np.radians(lat0))
+    coslat = np.cos(np.radians(lat0))
+    e = -sinlng * dx + coslng * dy
+    n = -sinlat * coslng * dx - sinlat * sinlng * dy + coslat * dz
+    u = coslat * coslng * dx + coslat * sinlng * dy + sinlat * dz
+    return np.column_stack([e, n, u])
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: GEODETIC FRAME
+#-------------------------------------------------------------------------------
+# Returns the (3,3) matrix with the earth centered east, north and up unit
+# vectors of the local tangent plane at (lng, lat) as rows.
+def geodeticframe(lng, lat):
+    sinlng = np.sin(np.radians(lng))
+    coslng = np.cos(np.radians(lng))
+    sinlat = np.sin(np.radians(lat))
+    coslat = np.cos(np.radians(lat))
+    return np.array([[-sinlng, coslng, 0.0],
+                     [-sinlat*coslng, -sinlat*sinlng, coslat],
+                     [coslat*coslng, coslat*sinlng, sinlat]])
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: GET TRANSFORMER
+#-------------------------------------------------------------------------------
+# Returns a function (x, y) -> (lng, lat) that converts arrays of coordinates in
+# srs to WGS84, or with bInverse the function (lng, lat) -> (x, y). It is built
+# only once per srs and process.
+def gettransformer(srs, bInverse=0):
+    key = (srs.lower(), bool(bInverse))
+    if key not in transformers:
+        if pyproj is None:
+            raise ConversionError("pyproj is required to reproject from " + srs)
+        source, target = (key[0], "epsg:4326") if not bInverse else ("epsg:4326", key[0])
+        try:
+            if hasattr(pyproj, "Transformer"):
+                transformers[key] = pyproj.Transformer.from_crs(source, target, always_xy=True).transform
+            else:
+                p1 = pyproj.Proj(init=source)
+                p2 = pyproj.Proj(init=target)
+                transformers[key] = lambda x, y: pyproj.transform(p1, p2, x, y)
+        except Exception as e:   #pyproj.exceptions.CRSError, RuntimeError in old versions
+            raise ConversionError("invalid srs " + srs + ": " + str(e))
+    return transformers[key]
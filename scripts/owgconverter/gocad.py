@@ -0,0 +1,194 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    GOCAD TSurf (.ts) parser.
+"""
+
+import re
+from array import array
+import numpy as np
+from .mesh import Mesh, ConversionError
+from .transform import swapaxes, centroid, transform
+from .geodesy import geodetictoenu, gettransformer
+
+
+visibilitydistance = 100000000
+defaultcolor = [0,0,0,1]
+centersrs = "epsg:21781"
+colorpattern = re.compile(r"\s*\*?\w*\*?color:\s*(.*)")   #e.g. *solid*color: 1 0 0 1
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: ID TO INDEX
+#-------------------------------------------------------------------------------
+# Maps GOCAD vertex ids to vertex indices. The ids are usually, but not
+# necessarily, 1..n. An id without a VRTX (or ATOM) is a ConversionError.
+def idtoindex(ids, query):
+    if len(ids) > 0 and ids[0] == 1 and ids[-1] == len(ids) and np.all(np.diff(ids) == 1):
+        unknown = (query < 1) | (query > len(ids))
+        if np.any(unknown):
+            raise ConversionError("unknown vertex id " + str(int(query[unknown][0])))
+        return query - 1
+    order = np.argsort(ids, kind="mergesort")
+    sortedids = ids[order]
+    pos = np.searchsorted(sortedids, query)
+    unknown = pos >= len(ids)
+    unknown[~unknown] = sortedids[pos[~unknown]] != query[~unknown]
+    if np.any(unknown):
+        raise ConversionError("unknown vertex id " + str(int(query[unknown][0])))
+    return order[pos]
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: MAKE MESH
+#-------------------------------------------------------------------------------
+# Creates the "pc" mesh of one GOCAD object. An ATOM is a new vertex id for an
+# existing vertex, its position is copied.
+def makemesh(positions, ids, atoms, triangles, color):
+    positions = np.frombuffer(positions, dtype=np.float64).reshape(-1,3)
+    ids = np.frombuffer(ids, dtype=ids.typecode).astype(np.int64)
+    atoms = np.frombuffer(atoms, dtype=atoms.typecode).astype(np.int64).reshape(-1,2)
+    indices = np.frombuffer(triangles, dtype=triangles.typecode).astype(np.int64)
+
+    if len(atoms) > 0:
+        positions = np.vstack([positions, positions[idtoindex(ids, atoms[:,1])]])
+        ids = np.concatenate([ids, atoms[:,0]])
+    if len(indices) > 0:
+        indices = idtoindex(ids, indices)
+
+    colors = np.tile(np.array(color, dtype=np.float64), (len(positions),1))
+    return Mesh("pc", np.hstack([positions, colors]), indices, visibilitydistance=visibilitydistance)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: PARSE GOCAD TS
+#-------------------------------------------------------------------------------
+# The file is read once, line by line, and every line is dispatched on its
+# first keyword. Coordinates and indices go directly into numeric buffers.
+# Yields an untransformed mesh with vertex semantic "pc" for every GOCAD object
+# of the file.
+def parsets(filename):
+    color = defaultcolor
+    positions = array('d')
+    ids = array('l')
+    atoms = array('l')
+    triangles = array('l')
+
+    f = open(filename, "r")
+    for line in f:
+        tokens = line.split()
+        if len(tokens) == 0:
+            continue
+        key = tokens[0]
+
+        if key == "VRTX" or key == "PVRTX":
+            ids.append(int(tokens[1]))
+            positions.extend([float(tokens[2]), float(tokens[3]), float(tokens[4])])
+
+        elif key == "TRGL":
+            triangles.extend([int(tokens[1]), int(tokens[2]), int(tokens[3])])
+
+        elif key == "ATOM" or key == "PATOM":
+            atoms.extend([int(tokens[1]), int(tokens[2])])
+
+        elif key == "GOCAD":
+            #make a new object
+            color = defaultcolor
+            positions = array('d')
+            ids = array('l')
+            atoms = array('l')
+            triangles = array('l')
+
+        elif key == "END":
+            yield makemesh(positions, ids, atoms, triangles, color)
+
+        else:
+            m = colorpattern.match(line)
+            if m:
+                color = [float(c) for c in m.group(1).split()]
+    f.close()
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: AXES
+#-------------------------------------------------------------------------------
+# axis order and signs of the ts converter
+# default: (x,y,z) -> (y,z,x)   flipxy: (x,y,z) -> (y,-z,x)   flipxz: unchanged
+def tsaxes(bFlipxy=0, bFlipxz=0):
+    if bFlipxy:
+        return (1,2,0), (1,-1,1)
+    elif bFlipxz:
+        return (0,1,2), (1,1,1)
+    return (1,2,0), (1,1,1)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: REPROJECT CENTER
+#-------------------------------------------------------------------------------
+# The center is given in swiss coordinates (EPSG:21781) and converted to WGS84.
+def reprojectcenter(mesh):
+    lng, lat = gettransformer(centersrs)(mesh.center[0], mesh.center[1])
+    mesh.center = np.array([lng, lat, mesh.center[2]])
+    return mesh
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: REPROJECT
+#-------------------------------------------------------------------------------
+# Reprojects every vertex of the mesh from srs to WGS84 and stores it as east,
+# north, up offset in meters from the center. The centroid is reprojected in
+# the same batched call and becomes the center of the mesh.
+def reproject(mesh, srs, order=(0,1,2), signs=(1,1,1), bInteger=0):
+    center = centroid(mesh, bInteger)
+    positions = mesh.positions()
+    x = np.append(positions[:,0], center[0])
+    y = np.append(positions[:,1], center[1])
+    lng, lat = gettransformer(srs)(x, y)
+    lng = np.asarray(lng)
+    lat = np.asarray(lat)
+
+    mesh.center = np.array([lng[-1], lat[-1], center[2]])
+    enu = geodetictoenu(lng[:-1], lat[:-1], positions[:,2], mesh.center[0], mesh.center[1], mesh.center[2])
+    vertices = mesh.vertices.copy()
+    vertices[:,0:3] = swapaxes(enu, order, signs)
+    mesh.vertices = vertices
+    return mesh
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: LOAD TS
+#-------------------------------------------------------------------------------
+# Yields the transformed meshes of all GOCAD objects of the file. If srs is
+# given, all vertices are reprojected from srs (always centered), otherwise
+# only the center is reprojected from EPSG:21781.
+def loadts(filename, bCalccenter=0, bFlipxy=0, bFlipxz=0, bInteger=0, srs=None):
+    order, signs = tsaxes(bFlipxy, bFlipxz)
+    if srs:
+        gettransformer(srs)   #fail early if srs is invalid
+    for mesh in parsets(filename):
+        print('Number of elements: ' + str(len(mesh.vertices)))
+        if srs:
+            reproject(mesh, srs, order, signs, bInteger)
+        else:
+            transform(mesh, bCalccenter, order, signs, bInteger)
+            reprojectcenter(mesh)
+        print('Center = (' + str(mesh.center[0]) + ', ' + str(mesh.center[1]) + ', ' + str(mesh.center[2]) + ')')
+        yield mesh
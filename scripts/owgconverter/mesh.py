@@ -0,0 +1,94 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Mesh object shared by all stages of the converter library.
+"""
+
+import numpy as np
+
+
+# number of floats per vertex for every vertex semantic
+vertexlength = {"p" : 3, "pc" : 7, "pt" : 5, "pnt" : 8, "pnc" : 10, "pnct" : 12}
+
+
+#-------------------------------------------------------------------------------
+# CLASS: CONVERSION ERROR
+#-------------------------------------------------------------------------------
+class ConversionError(Exception):
+    pass
+
+
+#-------------------------------------------------------------------------------
+# CLASS: MESH
+#-------------------------------------------------------------------------------
+# One surface of the geometry exchange format (documentation/JSON_Geometry.txt).
+# vertices is a float64 array with one row per vertex laid out as given by the
+# vertex semantic, indices a flat integer array.
+class Mesh(object):
+    def __init__(self, vertexsemantic, vertices, indices, center=(0,0,0), texture=None, id=1, visibilitydistance=None, indexsemantic="TRIANGLES"):
+        self.vertexsemantic = vertexsemantic
+        self.vertices = vertices
+        self.indices = indices
+        self.center = np.asarray(center, dtype=np.float64)
+        self.texture = texture
+        self.id = id
+        self.visibilitydistance = visibilitydistance
+        self.indexsemantic = indexsemantic
+        self.centroid = None   #centroid of the source vertex table, if it is not the one of the vertices
+        self.minvisibilitydistance = None   #set for simplified levels of detail
+        self.clusters = None   #index ranges with bounding boxes (cluster.clustermesh), not kept by copy
+
+    #---------------------------------------------------------------------------
+    def copy(self, vertices=None, indices=None, vertexsemantic=None):
+        mesh = Mesh(vertexsemantic if vertexsemantic is not None else self.vertexsemantic,
+                    vertices if vertices is not None else self.vertices,
+                    indices if indices is not None else self.indices,
+                    self.center, self.texture, self.id, self.visibilitydistance, self.indexsemantic)
+        mesh.centroid = self.centroid
+        mesh.minvisibilitydistance = self.minvisibilitydistance
+        return mesh
+
+    #---------------------------------------------------------------------------
+    def hasnormals(self):
+        return self.vertexsemantic.startswith("pn")
+
+    #---------------------------------------------------------------------------
+    def positions(self):
+        return self.vertices[:,0:3]
+
+    #---------------------------------------------------------------------------
+    def normals(self):
+        return self.vertices[:,3:6]
+
+    #---------------------------------------------------------------------------
+    # creates a mesh from a surface of a parsed json document
+    @staticmethod
+    def fromdict(surface):
+        vertexsemantic = surface["VertexSemantic"]
+        vertices = np.asarray(surface["Vertices"], dtype=np.float64).reshape(-1, vertexlength[vertexsemantic])
+        indices = np.asarray(surface["Indices"], dtype=np.int64)
+        mesh = Mesh(vertexsemantic, vertices, indices, surface.get("Center", (0,0,0)),
+                    surface.get("DiffuseMap"), surface.get("id", 1), surface.get("VisibilityDistance"),
+                    surface.get("IndexSemantic", "TRIANGLES"))
+        mesh.minvisibilitydistance = surface.get("MinVisibilityDistance")
+        if "Clusters" in surface:
+            mesh.clusters = np.asarray(surface["Clusters"], dtype=np.float64).reshape(-1, 8)
+        return mesh
@@ -0,0 +1,69 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Normal generation for meshes with vertex semantic "pc".
+"""
+
+import numpy as np
+from .mesh import ConversionError
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: COMPUTE NORMALS
+#-------------------------------------------------------------------------------
+# Every vertex gets the normalized mean of the unit normals of its adjacent
+# triangles, vertices without (non degenerated) triangles get (0,0,0).
+# Everything runs on whole arrays: gather the corners, batch cross product,
+# scatter-add to the vertices and interleave.
+# Returns a new mesh with vertex semantic "pnc".
+def computenormals(mesh, bFlipnormals=0):
+    if mesh.vertexsemantic != "pc":
+        raise ConversionError("normals can only be calculated for vertexsemantic 'pc'")
+
+    verts = mesh.vertices
+    numvertices = len(verts)
+    triangles = mesh.indices.reshape(-1,3)
+    positions = verts[:,0:3]
+
+    a = positions[triangles[:,0]]
+    b = positions[triangles[:,1]]
+    c = positions[triangles[:,2]]
+    n = np.cross(a-c, b-c)
+    l = np.sqrt(np.einsum("ij,ij->i", n, n))
+    l[l == 0] = 1.0
+    n /= l[:,np.newaxis]
+    if bFlipnormals:
+        n = -n
+
+    #split normals: sum the triangle normals of every vertex
+    corners = triangles.reshape(-1)
+    normals = np.empty((numvertices,3), dtype=np.float64)
+    for k in range(3):
+        normals[:,k] = np.bincount(corners, weights=np.repeat(n[:,k],3), minlength=numvertices)
+    l = np.sqrt(np.einsum("ij,ij->i", normals, normals))
+    l[l == 0] = 1.0
+    normals /= l[:,np.newaxis]
+
+    newverts = np.empty((numvertices,10), dtype=np.float64)
+    newverts[:,0:3] = positions
+    newverts[:,3:6] = normals
+    newverts[:,6:10] = verts[:,3:7]
+    return mesh.copy(vertices=newverts, vertexsemantic="pnc")
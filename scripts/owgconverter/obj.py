@@ -0,0 +1,185 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Wavefront OBJ parser.
+"""
+
+from array import array
+import numpy as np
+from .mesh import Mesh, ConversionError
+
+
+color = [1,0,0,1] #default color for position only vertices
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: GET VERTEX SEMANTIC FROM FACE DEFINITION
+#-------------------------------------------------------------------------------
+# "1"->p "1/2"->pt "1/2/3"->pnt "1//3"->pn
+def getvertexsemantic(vert):
+    a = vert.split('/')
+    if len(a) == 1:
+        return "p"
+    elif len(a) == 2:
+        return "pt"
+    elif a[1] == "":
+        return "pn"
+    return "pnt"
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: PARSE WAVEFRONT OBJ
+#-------------------------------------------------------------------------------
+# The file is parsed in a single pass, line by line. Coordinates are collected
+# in flat float buffers and every face corner as its (v, vt, vn) indices, the
+# vertex semantic is recognized on the first face definition.
+# Returns a dict with the float64 arrays "v", "vt", "vn" and the zero based
+# corner index arrays "fv", "fvt", "fvn".
+def parseobj(filename):
+    v = array('d')    #vert coordinates
+    vt = array('d')   #texture coordinate
+    vn = array('d')   #normal coordinates
+    fv = array('l')
+    fvt = array('l')
+    fvn = array('l')
+    vertexsemantic = ""
+
+    f = open(filename, "r")
+    for line in f:
+        tokens = line.split()
+        if len(tokens) == 0:
+            continue
+        key = tokens[0]
+
+        if key == "v":
+            v.extend([float(tokens[1]), float(tokens[2]), float(tokens[3])])
+
+        elif key == "vn":
+            vn.extend([float(tokens[1]), float(tokens[2]), float(tokens[3])])
+
+        elif key == "vt":
+            vt.extend([float(tokens[1]), float(tokens[2])])
+
+        elif key == "f": #face definition
+            if vertexsemantic == "":
+                vertexsemantic = getvertexsemantic(tokens[1])
+                if vertexsemantic == "pn":
+                    f.close()
+                    return {"vertexsemantic" : vertexsemantic}
+
+            for vert in tokens[1:]:
+                a = vert.split('/')  #note in wavefront it is: p/t/n and not pnt!
+                fv.append(int(a[0]))
+                if vertexsemantic != "p":
+                    fvt.append(int(a[1]))
+                if vertexsemantic == "pnt":
+                    fvn.append(int(a[2]))
+    f.close()
+
+    return {"vertexsemantic" : vertexsemantic,
+            "v" : np.frombuffer(v, dtype=np.float64).reshape(-1,3),
+            "vt" : np.frombuffer(vt, dtype=np.float64).reshape(-1,2),
+            "vn" : np.frombuffer(vn, dtype=np.float64).reshape(-1,3),
+            "fv" : np.frombuffer(fv, dtype=fv.typecode) - 1,
+            "fvt" : np.frombuffer(fvt, dtype=fvt.typecode) - 1,
+            "fvn" : np.frombuffer(fvn, dtype=fvn.typecode) - 1}
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WELD VERTICES
+#-------------------------------------------------------------------------------
+# Face corners referencing the same (v, vt, vn) triple become one vertex.
+# Returns the object reduced to its unique corners (in order of first use) and
+# the index buffer into them.
+def weld(obj):
+    keys = [obj["fv"]]
+    if len(obj["fvt"]) > 0:
+        keys.append(obj["fvt"])
+    if len(obj["fvn"]) > 0:
+        keys.append(obj["fvn"])
+    keys = np.column_stack(keys)
+
+    unique, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    corners = first[order]
+
+    welded = dict(obj)
+    welded["fv"] = obj["fv"][corners]
+    welded["fvt"] = obj["fvt"][corners] if len(obj["fvt"]) > 0 else obj["fvt"]
+    welded["fvn"] = obj["fvn"][corners] if len(obj["fvn"]) > 0 else obj["fvn"]
+    return welded, rank[inverse.reshape(-1)]
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: AXES
+#-------------------------------------------------------------------------------
+# axis order and signs of the obj converters
+# flipxy: (x,y,z) -> (y,-z,x)   flipxz: (x,y,z) -> (z,y,x)
+def objaxes(bFlipxy=0, bFlipxz=0):
+    if bFlipxy:
+        return (1,2,0), (1,-1,1)
+    elif bFlipxz:
+        return (2,1,0), (1,1,1)
+    return (0,1,2), (1,1,1)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: LOAD OBJ
+#-------------------------------------------------------------------------------
+# Parses and (optionally) welds a wavefront obj file into an untransformed mesh
+# with one vertex per face corner or, welded, per distinct (v, vt, vn) triple.
+def loadobj(filename, bWeld=0):
+    obj = parseobj(filename)
+    vertexsemantic = obj["vertexsemantic"]
+    if vertexsemantic == "pn":
+        raise ConversionError("vertexsemantic 'pn' is currently not supported")
+    if vertexsemantic == "":
+        raise ConversionError("no face definitions found")
+    print("vertexsemantic found: "+vertexsemantic)
+    for key, corners in [("v", "fv"), ("vt", "fvt"), ("vn", "fvn")]:
+        #relative (negative) indices are not supported
+        unknown = (obj[corners] < 0) | (obj[corners] >= len(obj[key]))
+        if np.any(unknown):
+            raise ConversionError("face refers to unknown " + key + " " + str(int(obj[corners][unknown][0]) + 1))
+
+    print('Number of elements: ' + str(len(obj["v"])))
+    if bWeld:
+        numcorners = len(obj["fv"])
+        obj, indices = weld(obj)
+        print('welding: ' + str(numcorners) + ' -> ' + str(len(obj["fv"])) + ' vertices (compression ratio ' + ('%.2f' % (float(numcorners) / max(len(obj["fv"]),1))) + ':1)')
+    else:
+        indices = np.arange(len(obj["fv"]))
+
+    positions = obj["v"][obj["fv"]]
+    columns = [positions]
+    if vertexsemantic == "p":
+        vertexsemantic = "pc"   #positions are written with the default color
+        columns.append(np.tile(np.array(color, dtype=np.float64), (len(positions),1)))
+    if vertexsemantic == "pnt":
+        columns.append(obj["vn"][obj["fvn"]])
+    if vertexsemantic != "pc":
+        columns.append(obj["vt"][obj["fvt"]])
+
+    mesh = Mesh(vertexsemantic, np.hstack(columns), indices, texture="")
+    mesh.centroid = obj["v"].mean(axis=0)
+    return mesh
@@ -0,0 +1,315 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Point cloud tiles in the binary format of source/core/pointcloud.js
+    (PointCloud.CreateFromBinary, version 1.0, little endian):
+
+        uint8       major version (1)
+        uint8       minor version (0)
+        float64[3]  offset (scaled cartesian, added to the model matrix)
+        uint8       format (0: "pc")
+        int32       number of points
+        points      float32 x, y, z (relative to offset), uint8 r, g, b, a
+
+    The header and the points are numpy structured arrays, a tile is written
+    with two tobytes() calls. Every tile has its own float64 offset (the center
+    of its points), so the float32 positions keep sub millimeter precision.
+
+    Tiles hold at most a point budget: the finest level is thinned with a voxel
+    grid, every coarser tile is thinned from its four children.
+"""
+
+import os
+import math
+import numpy as np
+from .mesh import ConversionError
+from .geodesy import geodetictocartesian, gettransformer
+from .quadtree import wgs84totilecoord, tilecoordtomorton, mortontotilecoord
+
+
+cartesianscale = 8388607.0   #CARTESIAN_SCALE of the viewer (mathutils.js)
+headerdtype = np.dtype([("major", "u1"), ("minor", "u1"), ("offset", "<f8", (3,)), ("format", "u1"), ("count", "<i4")])
+pointdtype = np.dtype([("position", "<f4", (3,)), ("color", "u1", (4,))])
+recorddtype = np.dtype([("key", "<i8"), ("position", "<f8", (3,)), ("color", "u1", (4,))])
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: POINT BLOCK
+#-------------------------------------------------------------------------------
+# Converts an (n,3), (n,6) or (n,7) array x, y, z[, r, g, b[, a]] to records
+# with the scaled cartesian positions and the morton key of the maxlod tile.
+# x, y are lng, lat or coordinates in srs, z is the ellipsoidal height.
+def pointblock(values, maxlod, srs=None):
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 2 or values.shape[1] not in (3, 6, 7):
+        raise ConversionError("points must have 3 (xyz), 6 (xyzrgb) or 7 (xyzrgba) values")
+    lng, lat, elv = values[:,0], values[:,1], values[:,2]
+    if srs is not None:
+        lng, lat = gettransformer(srs)(lng, lat)
+    records = np.empty(len(values), dtype=recorddtype)
+    tx, ty = wgs84totilecoord(lng, lat, maxlod)
+    records["key"] = tilecoordtomorton(tx, ty, maxlod)
+    records["position"] = np.column_stack(geodetictocartesian(lng, lat, elv)) / cartesianscale
+    records["color"] = 255
+    if values.shape[1] >= 6:
+        records["color"][:,0:values.shape[1]-3] = np.clip(values[:,3:], 0, 255)
+    return records
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: READ XYZ
+#-------------------------------------------------------------------------------
+# Yields (n,k) arrays of the points of an ascii file with one point per line
+# (x y z [r g b [a]], separated by blanks or commas). The file is read
+# blockwise, lines starting with # are skipped.
+def readxyz(f, blocksize=1<<22):
+    rest = ""
+    numvalues = None
+    while True:
+        block = f.read(blocksize)
+        if len(block) == 0:
+            lines = rest.splitlines()
+        else:
+            lines = (rest + block).split("\n")
+            rest = lines.pop()
+        lines = [line for line in lines if line.strip() != "" and not line.lstrip().startswith("#")]
+        if len(lines) > 0:
+            if numvalues is None:
+                numvalues = len(lines[0].replace(",", " ").split())
+            values = np.array(" ".join(lines).replace(",", " ").split(), dtype=np.float64)
+            if len(values) != numvalues * len(lines):
+                raise ConversionError("all lines of a point file must have the same number of values")
+            yield values.reshape(-1, numvalues)
+        if len(block) == 0:
+            break
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: READ NPY
+#-------------------------------------------------------------------------------
+# Yields blocks of a numpy dump (np.save) of an (n,k) array or of a structured
+# array with the fields x, y, z [, r, g, b [, a]]. The file is memory mapped.
+def readnpy(filename, blocksize=1<<20):
+    points = np.load(filename, mmap_mode="r")
+    names = points.dtype.names
+    if names is not None:
+        fields = [name for name in ["x", "y", "z", "r", "g", "b", "a"] if name in names]
+    for start in range(0, len(points), blocksize):
+        block = points[start:start+blocksize]
+        if names is not None:
+            block = np.column_stack([block[name] for name in fields])
+        yield block
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WRITE RUNS
+#-------------------------------------------------------------------------------
+# Sorts the records of recordfile in runs of runsize records (in memory) and
+# writes them to runfile. Returns the [start, end) of every run.
+def writeruns(recordfile, runfile, runsize):
+    records = np.memmap(recordfile, dtype=recorddtype, mode="r")
+    runs = []
+    g = open(runfile, "wb")
+    for start in range(0, len(records), runsize):
+        run = np.array(records[start:start+runsize])
+        g.write(run[np.argsort(run["key"], kind="mergesort")].tobytes())
+        runs.append([start, min(start + runsize, len(records))])
+    g.close()
+    return runs
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: MERGE RUNS
+#-------------------------------------------------------------------------------
+# k-way merge of the sorted runs of runfile, blocksize records of every run are
+# buffered. Every step writes all buffered records with a key up to the
+# smallest last key of the buffers of the unfinished runs (all later records
+# have larger keys), so the merge is vectorized and reads and writes
+# sequentially. Yields the written blocks.
+def mergeruns(runfile, runs, g, blocksize):
+    records = np.memmap(runfile, dtype=recorddtype, mode="r")
+    buffers = [records[0:0]] * len(runs)
+    while True:
+        for k, run in enumerate(runs):
+            if len(buffers[k]) == 0 and run[0] < run[1]:
+                buffers[k] = np.array(records[run[0]:min(run[0] + blocksize, run[1])])
+                run[0] += len(buffers[k])
+        pending = [buffer[-1]["key"] for buffer, run in zip(buffers, runs) if run[0] < run[1]]
+        bound = min(pending) if len(pending) > 0 else None
+        parts = []
+        for k, buffer in enumerate(buffers):
+            count = len(buffer) if bound is None else np.searchsorted(buffer["key"], bound, side="right")
+            parts.append(buffer[:count])
+            buffers[k] = buffer[count:]
+        block = np.concatenate(parts)
+        if len(block) == 0:
+            break
+        block = block[np.argsort(block["key"], kind="mergesort")]
+        g.write(block.tobytes())
+        yield block
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: SORT RECORDS
+#-------------------------------------------------------------------------------
+# Writes the records of recordfile ordered by key to sortedfile with an
+# external merge sort: about runsize records are in memory, while sorting the
+# runs and as merge buffers (runsize/k records of each of the k runs). Returns
+# the sorted unique keys and the number of records with each key.
+def sortrecords(recordfile, sortedfile, runsize=1<<22):
+    runfile = sortedfile + ".runs"
+    runs = writeruns(recordfile, runfile, runsize)
+    blocksize = max(runsize // max(len(runs), 1), 4096)
+    keys = []
+    counts = []
+    g = open(sortedfile, "wb")
+    for block in mergeruns(runfile, runs, g, blocksize):
+        blockkeys, blockcounts = np.unique(block["key"], return_counts=True)
+        if len(keys) > 0 and keys[-1][-1] == blockkeys[0]:
+            counts[-1][-1] += blockcounts[0]
+            blockkeys, blockcounts = blockkeys[1:], blockcounts[1:]
+        if len(blockkeys) > 0:
+            keys.append(blockkeys)
+            counts.append(blockcounts)
+    g.close()
+    os.remove(runfile)
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(keys), np.concatenate(counts)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE RANGES
+#-------------------------------------------------------------------------------
+# keys are the sorted unique morton keys of the maxlod tiles and counts their
+# numbers of points (sortrecords). Yields (lod, tx, ty, start, end) for every
+# non empty tile from maxlod to minlod, start:end are the points of the tile in
+# the sorted file (the points of a tile stay contiguous on all levels).
+def tileranges(keys, counts, minlod, maxlod):
+    offsets = np.r_[0, np.cumsum(counts)]
+    for lod in range(maxlod, minlod-1, -1):
+        codes = keys >> (2*(maxlod-lod))
+        starts = np.nonzero(np.r_[True, codes[1:] != codes[:-1]])[0] if len(codes) > 0 else []
+        ends = np.r_[starts[1:], len(codes)]
+        for start, end in zip(starts, ends):
+            tx, ty = mortontotilecoord(int(codes[start]), lod)
+            yield lod, tx, ty, int(offsets[start]), int(offsets[end])
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WRITE POINT CLOUD
+#-------------------------------------------------------------------------------
+# Writes the records (scaled cartesian float64 positions) as a point cloud tile.
+def writepointcloud(g, records):
+    header = np.zeros(1, dtype=headerdtype)
+    header["major"] = 1
+    header["minor"] = 0
+    header["format"] = 0
+    header["count"] = len(records)
+    if len(records) > 0:
+        offset = 0.5 * (records["position"].min(axis=0) + records["position"].max(axis=0))
+        header["offset"] = offset
+    points = np.empty(len(records), dtype=pointdtype)
+    if len(records) > 0:
+        points["position"] = records["position"] - offset
+        points["color"] = records["color"]
+    g.write(header.tobytes())
+    g.write(points.tobytes())
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: READ POINT CLOUD
+#-------------------------------------------------------------------------------
+# Reads a point cloud tile back as records (key 0).
+def readpointcloud(filename):
+    f = open(filename, "rb")
+    header = np.frombuffer(f.read(headerdtype.itemsize), dtype=headerdtype)[0]
+    if header["major"] != 1 or header["minor"] != 0 or header["format"] != 0:
+        raise ConversionError(filename + " is not a point cloud tile (version 1.0, format pc)")
+    points = np.frombuffer(f.read(int(header["count"]) * pointdtype.itemsize), dtype=pointdtype)
+    f.close()
+    records = np.zeros(len(points), dtype=recorddtype)
+    records["position"] = points["position"] + header["offset"]
+    records["color"] = points["color"]
+    return records
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: THIN POINTS
+#-------------------------------------------------------------------------------
+# Voxel grid thinning: the points are quantized to cubic cells, and every
+# occupied cell keeps its first point (or with bAverage the mean position and
+# color of its points). The cell size starts at the extent / sqrt(maxpoints)
+# (one layer of cells over the tile) and grows until at most maxpoints remain.
+def thinpoints(records, maxpoints, bAverage=0):
+    if len(records) <= maxpoints:
+        return records
+    positions = np.asarray(records["position"])
+    pmin = positions.min(axis=0)
+    cellsize = max(float(np.max(positions.max(axis=0) - pmin)), 1e-12) / math.sqrt(maxpoints)
+    while True:
+        cells = np.floor((positions - pmin) / cellsize).astype(np.int64)
+        dims = cells.max(axis=0) + 1
+        keys = (cells[:,0] * dims[1] + cells[:,1]) * dims[2] + cells[:,2]
+        keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        if len(keys) <= maxpoints:
+            break
+        cellsize *= 1.25
+    if not bAverage:
+        return records[np.sort(first)]
+    inverse = inverse.ravel()
+    counts = np.bincount(inverse).astype(np.float64)
+    thinned = np.zeros(len(keys), dtype=recorddtype)
+    thinned["key"] = records["key"][first]
+    for k in range(3):
+        thinned["position"][:,k] = np.bincount(inverse, weights=positions[:,k]) / counts
+    colors = np.asarray(records["color"], dtype=np.float64)
+    for k in range(4):
+        thinned["color"][:,k] = np.round(np.bincount(inverse, weights=colors[:,k]) / counts)
+    return thinned
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: BUILD POINT TILE
+#-------------------------------------------------------------------------------
+# Writes the points start:end of the sorted record file as a tile of the
+# finest level, thinned to maxpoints.
+def buildpointtile(sortedfile, start, end, maxpoints, filename, bAverage=0):
+    records = np.memmap(sortedfile, dtype=recorddtype, mode="r")
+    selection = thinpoints(np.array(records[start:end]), maxpoints, bAverage)
+    g = open(filename, "wb")
+    writepointcloud(g, selection)
+    g.close()
+    return len(selection)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: BUILD PARENT TILE
+#-------------------------------------------------------------------------------
+# Writes a tile of a coarser level from the (up to 4) tiles of the next finer
+# level, so no tile ever has to process more than 4*maxpoints points.
+def buildparenttile(childfiles, maxpoints, filename, bAverage=0):
+    records = np.concatenate([readpointcloud(childfile) for childfile in childfiles])
+    selection = thinpoints(records, maxpoints, bAverage)
+    g = open(filename, "wb")
+    writepointcloud(g, selection)
+    g.close()
+    return len(selection)
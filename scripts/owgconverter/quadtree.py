@@ -0,0 +1,130 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Mercator quadtree math, the same as source/core/mercatorquadtree.js.
+
+    Tiles are addressed with (x, y, lod), y counted from the north, or with a
+    quadkey string where every digit is xbit + 2*ybit. Tile coordinates of a
+    level of detail are interleaved into integer morton codes to use them as
+    a linear quadtree: the code of the parent tile is code >> 2.
+"""
+
+import math
+import numpy as np
+
+
+maxlatitude = 85.05112877980659
+equator = 40075016.68557849        #length of the WGS84 equator (meters)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WGS84 TO NORMALIZED
+#-------------------------------------------------------------------------------
+# lng, lat in degrees (arrays) -> normalized mercator coordinates in [0,1],
+# y pointing north (QuadKeyToNormalizedCoord)
+def wgs84tonormalized(lng, lat):
+    lat = np.radians(np.clip(lat, -maxlatitude, maxlatitude))
+    x = (np.asarray(lng, dtype=np.float64) + 180.0) / 360.0
+    y = 0.5 + np.log(np.tan(0.25*np.pi + 0.5*lat)) / (2.0*np.pi)
+    return x, y
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WGS84 TO TILE COORD
+#-------------------------------------------------------------------------------
+# Returns the x and y tile coordinates (arrays) of the tiles of level lod
+# containing the positions.
+def wgs84totilecoord(lng, lat, lod):
+    x, y = wgs84tonormalized(lng, lat)
+    n = 1 << lod
+    tx = np.clip(np.floor(x * n), 0, n-1).astype(np.int64)
+    ty = np.clip(np.floor((1.0 - y) * n), 0, n-1).astype(np.int64)
+    return tx, ty
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE COORD TO MORTON
+#-------------------------------------------------------------------------------
+# Interleaves tile coordinates (arrays) to morton codes, x in the even bits.
+def tilecoordtomorton(tx, ty, lod):
+    code = np.zeros(np.shape(tx), dtype=np.int64)
+    for i in range(lod):
+        code |= ((tx >> i) & 1) << (2*i)
+        code |= ((ty >> i) & 1) << (2*i+1)
+    return code
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: MORTON TO TILE COORD
+#-------------------------------------------------------------------------------
+def mortontotilecoord(code, lod):
+    tx = ty = 0
+    for i in range(lod):
+        tx |= ((code >> (2*i)) & 1) << i
+        ty |= ((code >> (2*i+1)) & 1) << i
+    return tx, ty
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE COORD TO QUADKEY
+#-------------------------------------------------------------------------------
+def tilecoordtoquadkey(tx, ty, lod):
+    quadkey = ""
+    for i in range(lod, 0, -1):
+        mask = 1 << (i-1)
+        quadkey += str((1 if tx & mask else 0) + (2 if ty & mask else 0))
+    return quadkey
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: QUADKEY TO TILE COORD
+#-------------------------------------------------------------------------------
+# Returns (x, y, lod) like QuadKeyToTileCoord.
+def quadkeytotilecoord(quadkey):
+    lod = len(quadkey)
+    tx = ty = 0
+    for i in range(lod, 0, -1):
+        mask = 1 << (i-1)
+        digit = int(quadkey[lod-i])
+        if digit & 1:
+            tx |= mask
+        if digit & 2:
+            ty |= mask
+    return tx, ty, lod
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE BOUNDS
+#-------------------------------------------------------------------------------
+# Returns (lngmin, latmin, lngmax, latmax) of a tile in degrees.
+def tilebounds(tx, ty, lod):
+    n = float(1 << lod)
+    def latitude(y):
+        return 90.0 - 360.0 * math.atan(math.exp(-(0.5 - y/n) * 2.0 * math.pi)) / math.pi
+    return (360.0*tx/n - 180.0, latitude(ty+1), 360.0*(tx+1)/n - 180.0, latitude(ty))
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE SIZE
+#-------------------------------------------------------------------------------
+# Width of the tiles of level lod in meters at latitude lat (degrees).
+def tilesize(lod, lat=0.0):
+    return equator * np.cos(np.radians(lat)) / (1 << lod)
@@ -0,0 +1,94 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Streaming reader for the json geometry exchange format
+    (documentation/JSON_Geometry.txt).
+"""
+
+import re
+from .mesh import ConversionError
+
+
+# strings (possibly cut at the end of the buffer) and the brackets that define
+# the structure of the document
+tokenpattern = re.compile(r'"(?:[^"\\]|\\.)*(")?|[{}\[\]]')
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: READ SURFACES
+#-------------------------------------------------------------------------------
+# Yields (layer, text) for every surface of the document in f, layer is the
+# index of the mesh in the outer array and text the unparsed json object of
+# the surface (use json.loads and Mesh.fromdict on it). With bemptylayers a
+# layer without surfaces yields (layer, None), so the layers can be written
+# again as they were. The file is read blockwise, only the surface currently
+# scanned is held in memory.
+def readsurfaces(f, blocksize=1<<20, bemptylayers=0):
+    buf = ""
+    pos = 0             # scan position in buf
+    start = 0           # start of the current surface in buf
+    arraydepth = 0
+    objectdepth = 0
+    layer = -1
+    surfaces = 0        # surfaces of the current layer
+    bEof = False
+    while not bEof:
+        block = f.read(max(blocksize, len(buf)))  # grow with large surfaces
+        bEof = len(block) == 0
+        if objectdepth > 0:
+            pos -= start
+            buf = buf[start:] + block
+            start = 0
+        else:
+            buf = buf[pos:] + block
+            pos = 0
+        for m in tokenpattern.finditer(buf, pos):
+            token = m.group()
+            if token[0] == '"':
+                if m.group(1) is None and not bEof:
+                    break           # string continues in the next block
+            elif objectdepth > 0:
+                if token == "{":
+                    objectdepth += 1
+                elif token == "}":
+                    objectdepth -= 1
+                    if objectdepth == 0:
+                        surfaces += 1
+                        yield layer, buf[start:m.end()]
+            elif token == "{":
+                if arraydepth != 2:
+                    raise ConversionError("surfaces must be stored as [[{...},...],...]")
+                objectdepth = 1
+                start = m.start()
+            elif token == "[":
+                arraydepth += 1
+                if arraydepth == 2:
+                    layer += 1
+                    surfaces = 0
+            elif token == "]":
+                if arraydepth == 2 and surfaces == 0 and bemptylayers:
+                    yield layer, None
+                arraydepth -= 1
+            else:
+                raise ConversionError("unexpected '}' in json geometry")
+            pos = m.end()
+    if objectdepth > 0 or arraydepth > 0:
+        raise ConversionError("unexpected end of json geometry")
@@ -0,0 +1,292 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Quadric edge collapse simplification and level of detail chains.
+"""
+
+import math
+import numpy as np
+
+
+boundaryweight = 1000.0     #weight of the quadrics that keep borders and seams in place
+fov = 45.0                  #vertical field of view of the viewer (degrees)
+screenheight = 1024         #pixels
+pixelerror = 1.0            #tolerated screen space error of a level of detail (pixels)
+maxvisibilitydistance = 100000000.0     #of the coarsest level, the viewer default is only 50000
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: PLANE QUADRICS
+#-------------------------------------------------------------------------------
+# Returns the quadrics w*(n,d)(n,d)^T of the planes through points with the
+# unit normals normals.
+def planequadrics(normals, points, weights):
+    planes = np.hstack((normals, -np.einsum("ij,ij->i", normals, points)[:,np.newaxis]))
+    return weights[:,np.newaxis,np.newaxis] * planes[:,:,np.newaxis] * planes[:,np.newaxis,:]
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: VERTEX QUADRICS
+#-------------------------------------------------------------------------------
+# Sums the area weighted quadrics of the adjacent triangles for every vertex.
+# Border edges (edges with only one triangle, including texture seams of
+# unwelded meshes) get an additional perpendicular plane so they are kept.
+# Returns the quadrics (n,4,4) used to choose the collapses, the quadrics of
+# the triangles only (n,4,4) used to measure the error and the triangle area
+# of every vertex (n).
+def vertexquadrics(positions, faces):
+    numvertices = len(positions)
+    a = positions[faces[:,0]]
+    n = np.cross(positions[faces[:,1]]-a, positions[faces[:,2]]-a)
+    area = np.sqrt(np.einsum("ij,ij->i", n, n))
+    n /= np.where(area > 0, area, 1.0)[:,np.newaxis]
+    area *= 0.5
+
+    quadrics = np.zeros((numvertices,4,4), dtype=np.float64)
+    weights = np.zeros(numvertices, dtype=np.float64)
+    facequadrics = planequadrics(n, a, area)
+    for k in range(3):
+        np.add.at(quadrics, faces[:,k], facequadrics)
+        np.add.at(weights, faces[:,k], area)
+    errorquadrics = quadrics.copy()
+
+    edges = np.vstack((faces[:,[0,1]], faces[:,[1,2]], faces[:,[2,0]]))
+    keys = np.sort(edges, axis=1)
+    keys = keys[:,0] * numvertices + keys[:,1]
+    counts = np.unique(keys, return_inverse=True, return_counts=True)
+    border = counts[2][counts[1].reshape(-1)] == 1
+    if np.any(border):
+        edges = edges[border]
+        facenormals = np.tile(n, (3,1))[border]
+        p0 = positions[edges[:,0]]
+        d = positions[edges[:,1]] - p0
+        bn = np.cross(d, facenormals)
+        l = np.sqrt(np.einsum("ij,ij->i", bn, bn))
+        bn /= np.where(l > 0, l, 1.0)[:,np.newaxis]
+        borderquadrics = planequadrics(bn, p0, boundaryweight * np.einsum("ij,ij->i", d, d))
+        for k in range(2):
+            np.add.at(quadrics, edges[:,k], borderquadrics)
+    return quadrics, errorquadrics, weights
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: QUADRIC ERROR
+#-------------------------------------------------------------------------------
+def quadricerror(quadrics, points):
+    h = np.hstack((points, np.ones((len(points),1))))
+    return np.maximum(np.einsum("ei,eij,ej->e", h, quadrics, h), 0.0)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: COLLAPSE TARGETS
+#-------------------------------------------------------------------------------
+# For every edge (i,j) the position minimizing the summed quadric among both
+# endpoints, the midpoint and the optimal position (if it is well defined and
+# close to the edge). Returns the positions, their cost and the parameter t
+# along the edge used to interpolate the vertex attributes.
+def collapsetargets(positions, quadrics, edges):
+    q = quadrics[edges[:,0]] + quadrics[edges[:,1]]
+    p0 = positions[edges[:,0]]
+    p1 = positions[edges[:,1]]
+    d = p1 - p0
+    length2 = np.einsum("ij,ij->i", d, d)
+
+    candidates = [p0, p1, 0.5*(p0+p1)]
+    optimal = 0.5*(p0+p1)
+    a = q[:,0:3,0:3]
+    det = np.linalg.det(a)
+    scale = np.einsum("eii->e", a)**3
+    solvable = np.abs(det) > 1e-10 * np.abs(scale)
+    if np.any(solvable):
+        optimal[solvable] = np.linalg.solve(a[solvable], -q[solvable,0:3,3:4])[:,:,0]
+    offset = optimal - candidates[2]
+    solvable &= np.einsum("ij,ij->i", offset, offset) <= length2
+    candidates.append(optimal)
+
+    costs = np.vstack([quadricerror(q, c) for c in candidates])
+    costs[3,~solvable] = np.inf
+    best = np.argmin(costs, axis=0)
+    index = np.arange(len(edges))
+    target = np.stack(candidates)[best, index]
+    t = np.einsum("ij,ij->i", target - p0, d) / np.where(length2 > 0, length2, 1.0)
+    return target, costs[best, index], np.clip(t, 0.0, 1.0)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: FACE NORMALS
+#-------------------------------------------------------------------------------
+def facenormals(positions, faces):
+    a = positions[faces[:,0]]
+    return np.cross(positions[faces[:,1]]-a, positions[faces[:,2]]-a)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: EDGE COLLAPSE
+#-------------------------------------------------------------------------------
+# Collapses edges until at most numtriangles triangles are left or no edge can
+# be collapsed without flipping a triangle. Every pass collapses a set of
+# independent edges at once: the edges that are the cheapest edge of both of
+# their vertices. vertices holds the positions in the first three columns,
+# the remaining columns are interpolated along the collapsed edges.
+# Returns vertices, faces, the quadrics, the weights and the largest error
+# (the area weighted RMS distance of a collapsed vertex to the planes of the
+# original triangles it replaces).
+def edgecollapse(vertices, faces, quadrics, errorquadrics, weights, numtriangles, error=0.0):
+    while len(faces) > numtriangles:
+        numvertices = len(vertices)
+        positions = vertices[:,0:3]
+        edges = np.vstack((faces[:,[0,1]], faces[:,[1,2]], faces[:,[2,0]]))
+        edges = np.sort(edges, axis=1)
+        keys = np.unique(edges[:,0] * numvertices + edges[:,1])
+        edges = np.column_stack((keys // numvertices, keys % numvertices))
+        target, cost, t = collapsetargets(positions, quadrics, edges)
+
+        # independent set: every vertex takes part in its cheapest edge only.
+        # Edges whose collapse would flip a triangle are blocked and the set
+        # is chosen again.
+        rank = np.empty(len(edges), dtype=np.int64)
+        rank[np.lexsort((np.arange(len(edges)), cost))] = np.arange(len(edges))
+        blocked = ~np.isfinite(cost)
+        oldnormals = facenormals(positions, faces)
+        while True:
+            candidates = np.nonzero(~blocked)[0]
+            best = np.full(numvertices, len(edges), dtype=np.int64)
+            np.minimum.at(best, edges[candidates,0], rank[candidates])
+            np.minimum.at(best, edges[candidates,1], rank[candidates])
+            selected = candidates[(best[edges[candidates,0]] == rank[candidates]) & (best[edges[candidates,1]] == rank[candidates])]
+            selected = selected[np.argsort(cost[selected])]
+            selected = selected[:max((len(faces) - numtriangles) // 2, 1)]
+            if len(selected) == 0:
+                break
+
+            keep, remove = edges[selected,0], edges[selected,1]
+            remap = np.arange(numvertices)
+            remap[remove] = keep
+            newpositions = positions.copy()
+            newpositions[keep] = target[selected]
+            newfaces = remap[faces]
+            moved = np.zeros(numvertices, dtype=bool)
+            moved[keep] = True
+            changed = moved[newfaces].any(axis=1)
+            changed &= (newfaces[:,0] != newfaces[:,1]) & (newfaces[:,1] != newfaces[:,2]) & (newfaces[:,2] != newfaces[:,0])
+            newnormals = facenormals(newpositions, newfaces[changed])
+            flipped = np.einsum("ij,ij->i", newnormals, oldnormals[changed]) <= 0
+            if not np.any(flipped):
+                break
+            bad = np.zeros(numvertices, dtype=bool)
+            bad[newfaces[changed][flipped].reshape(-1)] = True
+            blocked[selected[bad[keep]]] = True
+        if len(selected) == 0:
+            break
+
+        # collapse
+        keep, remove = edges[selected,0], edges[selected,1]
+        ts = t[selected][:,np.newaxis]
+        vertices = vertices.copy()
+        vertices[keep,3:] = (1.0-ts) * vertices[keep,3:] + ts * vertices[remove,3:]
+        vertices[keep,0:3] = target[selected]
+        quadrics[keep] += quadrics[remove]
+        errorquadrics[keep] += errorquadrics[remove]
+        weights[keep] += weights[remove]
+        w = weights[keep]
+        e = quadricerror(errorquadrics[keep], target[selected]) / np.where(w > 0, w, 1.0)
+        error = max(error, math.sqrt(np.max(e)))
+
+        remap = np.arange(numvertices)
+        remap[remove] = keep
+        faces = remap[faces]
+        faces = faces[(faces[:,0] != faces[:,1]) & (faces[:,1] != faces[:,2]) & (faces[:,2] != faces[:,0])]
+        first = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)[1]
+        faces = faces[np.sort(first)]
+
+        # remove unused vertices
+        used = np.zeros(numvertices, dtype=bool)
+        used[faces.reshape(-1)] = True
+        index = np.cumsum(used) - 1
+        vertices, quadrics, errorquadrics, weights = vertices[used], quadrics[used], errorquadrics[used], weights[used]
+        faces = index[faces]
+    return vertices, faces, quadrics, errorquadrics, weights, error
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: SIMPLIFY MESH
+#-------------------------------------------------------------------------------
+# Returns the mesh reduced to at most numtriangles triangles and its error.
+def simplifymesh(mesh, numtriangles):
+    levels = list(simplifychain(mesh, [numtriangles]))
+    if len(levels) == 0:
+        return mesh, 0.0
+    return levels[0]
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: SIMPLIFY CHAIN
+#-------------------------------------------------------------------------------
+# Yields (mesh, error) reduced to every number of triangles in counts (in
+# decreasing order). Every level continues from the previous one and the
+# error is measured against the original mesh. Stops early if the mesh
+# can't be reduced any further.
+def simplifychain(mesh, counts):
+    vertices = mesh.vertices
+    faces = mesh.indices.reshape(-1,3)
+    quadrics, errorquadrics, weights = vertexquadrics(vertices[:,0:3], faces)
+    error = 0.0
+    for numtriangles in counts:
+        numfaces = len(faces)
+        vertices, faces, quadrics, errorquadrics, weights, error = edgecollapse(vertices, faces, quadrics, errorquadrics, weights, numtriangles, error)
+        if len(faces) == numfaces:
+            return
+        lod = mesh.copy(vertices=vertices, indices=faces.reshape(-1))
+        if mesh.hasnormals():
+            n = lod.vertices[:,3:6]
+            l = np.sqrt(np.einsum("ij,ij->i", n, n))
+            n /= np.where(l > 0, l, 1.0)[:,np.newaxis]
+        yield lod, error
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: LOD CHAIN
+#-------------------------------------------------------------------------------
+# Yields the mesh and numlevels-1 simplified versions with ratio times the
+# triangles of the previous level. Every level is visible from the distance
+# where its error is below pixelerror on screen (MinVisibilityDistance) to the
+# distance where the next level takes over (VisibilityDistance). The chain
+# covers the whole range: the coarsest level is visible up to the visibility
+# distance of the mesh or, if it has none, up to maxvisibilitydistance. Levels
+# with an empty distance range are left out.
+def lodchain(mesh, numlevels=4, ratio=0.25):
+    if numlevels <= 1:
+        yield mesh
+        return
+    factor = screenheight / (2.0 * math.tan(math.radians(fov) / 2.0) * pixelerror)
+    numtriangles = len(mesh.indices) // 3
+    counts = [int(numtriangles * ratio**k) for k in range(1, numlevels)]
+    levels = [(mesh.copy(), 0.0)] + list(simplifychain(mesh, [c for c in counts if c > 0]))
+    lastdistance = mesh.visibilitydistance if mesh.visibilitydistance is not None else maxvisibilitydistance
+    distances = [error * factor for lod, error in levels] + [lastdistance]
+    for k, (lod, error) in enumerate(levels):
+        mindistance, maxdistance = distances[k], distances[k+1]
+        if mindistance >= maxdistance:
+            continue
+        if k > 0:
+            lod.minvisibilitydistance = mindistance
+        lod.visibilitydistance = maxdistance
+        yield lod
@@ -0,0 +1,57 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Splitting of meshes into surfaces addressable with 16 bit indices.
+"""
+
+import numpy as np
+
+
+maxvertices = 65535   #every surface must be addressable with 16 bit indices
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: SPLIT MESH
+#-------------------------------------------------------------------------------
+# Partitions the triangles in their original order into chunks that reference
+# at most maxvertices distinct vertices. Vertices shared with triangles of an
+# earlier chunk are duplicated. Yields a mesh with locally remapped indices for
+# every chunk, so only one chunk is held at a time.
+def splitmesh(mesh, maxvertices=maxvertices):
+    triangles = mesh.indices.reshape(-1,3)
+    blocksize = 2 * maxvertices   #closed meshes have about two triangles per vertex
+    start = 0
+    while start < len(triangles):
+        # number of distinct vertices after each triangle of the block
+        flat = triangles[start:start+blocksize].reshape(-1)
+        first = np.unique(flat, return_index=True)[1]
+        isnew = np.zeros(len(flat), dtype=np.int64)
+        isnew[first] = 1
+        count = np.cumsum(isnew.reshape(-1,3).sum(axis=1))
+        numtriangles = int(np.searchsorted(count, maxvertices, side='right'))
+
+        flat = flat[:3*numtriangles]
+        unique, first, inverse = np.unique(flat, return_index=True, return_inverse=True)
+        order = np.argsort(first)   #keep vertices in order of first use
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        yield mesh.copy(vertices=mesh.vertices[unique[order]], indices=rank[inverse.reshape(-1)])
+        start += numtriangles
@@ -0,0 +1,200 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Packed tile archives: all tiles of a layer in one file instead of a
+    lod/x/y tree, to copy it (documentation/Tile_Archive.txt). The viewer
+    reads the tree, unpacktiles writes it.
+
+    The index at the end of the archive is sorted in quadkey order. The reader
+    maps the archive with mmap, a tile is a memoryview of the mapping.
+"""
+
+import os
+import os.path
+import mmap
+import struct
+import numpy as np
+from .mesh import ConversionError
+from .quadtree import tilecoordtomorton, mortontotilecoord
+
+
+magic = b"OWGT"
+headerformat = "<4sBBHI8sIQ"   #magic, major, minor, reserved, count, extension, reserved, index offset
+headersize = struct.calcsize(headerformat)
+entrydtype = np.dtype([("offset", "<u8"), ("length", "<u4"), ("lod", "u1"), ("reserved", "u1", 3)])
+maxlod = 30
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE KEY
+#-------------------------------------------------------------------------------
+# Morton code of the tile shifted to maxlod: keys sorted by (key, lod) are in
+# quadkey order.
+def tilekey(lod, tx, ty):
+    return int(tilecoordtomorton(tx, ty, lod)) << (2*(maxlod - lod))
+
+
+#-------------------------------------------------------------------------------
+# CLASS: TILE ARCHIVE WRITER
+#-------------------------------------------------------------------------------
+# Appends the tiles (in any order) to the archive, close() writes the index.
+class TileArchiveWriter(object):
+    def __init__(self, filename, extension):
+        if len(extension) > 8:
+            raise ConversionError("tile extension too long: " + extension)
+        self.extension = extension
+        self.f = open(filename, "wb")
+        self.f.write(b"\0" * headersize)
+        self.offset = headersize
+        self.tiles = {}   #(key, lod) -> (offset, length)
+
+    #---------------------------------------------------------------------------
+    def add(self, lod, tx, ty, data):
+        if lod > maxlod:
+            raise ConversionError("tile lod " + str(lod) + " > " + str(maxlod))
+        key = (tilekey(lod, tx, ty), lod)
+        if key in self.tiles:
+            raise ConversionError("duplicate tile " + "/".join([str(lod), str(tx), str(ty)]))
+        self.f.write(data)
+        self.tiles[key] = (self.offset, len(data))
+        self.offset += len(data)
+
+    #---------------------------------------------------------------------------
+    def close(self):
+        keys = sorted(self.tiles.keys())
+        self.f.write(b"\0" * ((-self.offset) % 8))   #index aligned to 8 bytes
+        indexoffset = self.offset + (-self.offset) % 8
+        entries = np.zeros(len(keys), dtype=entrydtype)
+        entries["offset"] = [self.tiles[k][0] for k in keys]
+        entries["length"] = [self.tiles[k][1] for k in keys]
+        entries["lod"] = [k[1] for k in keys]
+        self.f.write(np.array([k[0] for k in keys], dtype="<u8").tobytes())
+        self.f.write(entries.tobytes())
+        self.f.seek(0)
+        self.f.write(struct.pack(headerformat, magic, 1, 0, 0, len(keys), self.extension.encode("ascii"), 0, indexoffset))
+        self.f.close()
+
+
+#-------------------------------------------------------------------------------
+# CLASS: TILE ARCHIVE
+#-------------------------------------------------------------------------------
+# Read only access to an archive. gettile returns a memoryview into the mapped
+# file (no copy); release the views before close().
+class TileArchive(object):
+    def __init__(self, filename):
+        self.f = open(filename, "rb")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = struct.unpack(headerformat, self.mm[0:headersize])
+        if header[0] != magic or header[1] != 1:
+            self.close()
+            raise ConversionError(filename + " is not a tile archive (version 1)")
+        self.count = header[4]
+        self.extension = header[5].rstrip(b"\0").decode("ascii")
+        indexoffset = header[7]
+        self.data = np.frombuffer(self.mm, dtype=np.uint8)
+        self.view = memoryview(self.data)
+        self.keys = np.frombuffer(self.mm, dtype="<u8", count=self.count, offset=indexoffset)
+        self.entries = np.frombuffer(self.mm, dtype=entrydtype, count=self.count, offset=indexoffset + 8*self.count)
+
+    #---------------------------------------------------------------------------
+    # position of the tile in the index, -1 if it is not in the archive
+    def find(self, lod, tx, ty):
+        key = tilekey(lod, tx, ty)
+        i = int(np.searchsorted(self.keys, key))
+        while i < self.count and int(self.keys[i]) == key:   #tiles with the same key differ in lod
+            if int(self.entries[i]["lod"]) == lod:
+                return i
+            i += 1
+        return -1
+
+    #---------------------------------------------------------------------------
+    # content of the tile (memoryview), None if it is not in the archive
+    def gettile(self, lod, tx, ty):
+        i = self.find(lod, tx, ty)
+        if i < 0:
+            return None
+        offset = int(self.entries[i]["offset"])
+        return self.view[offset:offset + int(self.entries[i]["length"])]
+
+    #---------------------------------------------------------------------------
+    # (lod, tx, ty) of all tiles in quadkey order
+    def tiles(self):
+        for i in range(self.count):
+            lod = int(self.entries[i]["lod"])
+            tx, ty = mortontotilecoord(int(self.keys[i]) >> (2*(maxlod - lod)), lod)
+            yield lod, tx, ty
+
+    #---------------------------------------------------------------------------
+    def close(self):
+        self.view = self.data = self.keys = self.entries = None
+        self.mm.close()
+        self.f.close()
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: PACK TILES
+#-------------------------------------------------------------------------------
+# Packs a tile tree directory/lod/x/y.extension into an archive. Returns the
+# number of tiles.
+def packtiles(directory, filename):
+    tiles = []
+    extensions = set()
+    for dirname, dirnames, filenames in os.walk(directory):
+        parts = os.path.relpath(dirname, directory).split(os.sep)
+        if len(parts) != 2 or not (parts[0].isdigit() and parts[1].isdigit()):
+            continue
+        for f in filenames:
+            name, extension = os.path.splitext(f)
+            if name.isdigit():
+                tiles.append((int(parts[0]), int(parts[1]), int(name), os.path.join(dirname, f)))
+                extensions.add(extension[1:])
+    if len(extensions) > 1:
+        raise ConversionError("tiles with different extensions: " + ", ".join(sorted(extensions)))
+    writer = TileArchiveWriter(filename, extensions.pop() if extensions else "")
+    tiles.sort(key=lambda t: (tilekey(t[0], t[1], t[2]), t[0]))   #payloads in quadkey order
+    for lod, tx, ty, tilefile in tiles:
+        f = open(tilefile, "rb")
+        writer.add(lod, tx, ty, f.read())
+        f.close()
+    writer.close()
+    return len(tiles)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: UNPACK TILES
+#-------------------------------------------------------------------------------
+# Writes the tiles of an archive to directory/lod/x/y.extension, returns the
+# number of tiles.
+def unpacktiles(filename, directory):
+    archive = TileArchive(filename)
+    count = 0
+    for lod, tx, ty in archive.tiles():
+        dirname = os.path.join(directory, str(lod), str(tx))
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        g = open(os.path.join(dirname, str(ty) + "." + archive.extension), "wb")
+        tile = archive.gettile(lod, tx, ty)
+        g.write(tile)
+        g.close()
+        del tile
+        count += 1
+    archive.close()
+    return count
@@ -0,0 +1,196 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Tiling of converted geometry into the tile pyramid of the owg geometry
+    layer (source/core/layer/geometrylayer_owg.js, source/core/geometry.js).
+
+    Every surface is placed in the tiles containing its Center (lng, lat, elv)
+    from maxlod up to minlod. Coarser tiles get simplified versions whose error
+    is below one pixel of the tile and leave out surfaces smaller than a pixel.
+    The surfaces are bucketed with a linear quadtree: the morton code of the
+    maxlod tile of every surface is computed once, the tile of a coarser level
+    is the shifted code, so all tiles of a level are found by one sort.
+"""
+
+import json
+import numpy as np
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+from .mesh import Mesh, vertexlength
+from .geodesy import geodetictocartesian, geodeticframe
+from .quadtree import wgs84totilecoord, tilecoordtomorton, mortontotilecoord, tilebounds, tilesize
+from .simplify import simplifychain
+from .split import splitmesh, maxvertices
+from .writer import writerows, numberformat
+
+
+cartesianscale = 8388607.0   #CARTESIAN_SCALE of the viewer (mathutils.js)
+localaxes = [1, 2, 0]        #converter axes x, y, z are north, up, east
+tilepixels = 256             #resolution of a tile used for the error threshold
+lodratio = 0.25              #triangles of a simplified version relative to the previous one
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: CACHE SURFACE
+#-------------------------------------------------------------------------------
+# Writes the vertices and indices of the surface and its simplified versions
+# as raw arrays to the cache file used between the tiling passes. Returns the
+# index record (lng, lat, radius, [error of every level], header), header
+# holds what is needed to read a level back with loadmesh.
+def cachesurface(mesh, cachefile):
+    positions = mesh.vertices[:,0:3]
+    radius = float(np.sqrt(np.max(np.einsum("ij,ij->i", positions, positions)))) if len(positions) > 0 else 0.0
+    numtriangles = len(mesh.indices) // 3
+    counts = []
+    while int(numtriangles * lodratio**(len(counts)+1)) >= 4:
+        counts.append(int(numtriangles * lodratio**(len(counts)+1)))
+
+    g = open(cachefile, "wb")
+    errors = []
+    sizes = []
+    for lod, error in [(mesh, 0.0)] + list(simplifychain(mesh, counts)):
+        g.write(np.ascontiguousarray(lod.vertices, dtype=np.float64).tobytes())
+        g.write(np.ascontiguousarray(lod.indices, dtype=np.int64).tobytes())
+        errors.append(error)
+        sizes.append((len(lod.vertices), len(lod.indices)))
+    g.close()
+    header = (mesh.vertexsemantic, mesh.indexsemantic, mesh.texture or "", tuple([float(c) for c in mesh.center]), sizes)
+    return float(mesh.center[0]), float(mesh.center[1]), radius, errors, header
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: LOAD MESH
+#-------------------------------------------------------------------------------
+def loadmesh(cachefile, level, header):
+    vertexsemantic, indexsemantic, texture, center, sizes = header
+    length = vertexlength[vertexsemantic]
+    offset = sum([8*(numvertices*length + numindices) for numvertices, numindices in sizes[:level]])
+    numvertices, numindices = sizes[level]
+    f = open(cachefile, "rb")
+    f.seek(offset)
+    vertices = np.frombuffer(f.read(8*numvertices*length), dtype=np.float64).reshape(-1, length)
+    indices = np.frombuffer(f.read(8*numindices), dtype=np.int64)
+    f.close()
+    return Mesh(vertexsemantic, vertices, indices, center, texture, indexsemantic=indexsemantic)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE JOBS
+#-------------------------------------------------------------------------------
+# records is a list of (cachefile, lng, lat, radius, errors, header). Yields
+# (lod, tx, ty, [(cachefile, level, header) of every member]) for every non
+# empty tile.
+def tilejobs(records, minlod, maxlod):
+    if len(records) == 0:
+        return
+    lng = np.array([r[1] for r in records])
+    lat = np.array([r[2] for r in records])
+    radius = np.array([r[3] for r in records])
+    tx, ty = wgs84totilecoord(lng, lat, maxlod)
+    codes = tilecoordtomorton(tx, ty, maxlod)
+    for lod in range(maxlod, minlod-1, -1):
+        pixel = tilesize(lod, lat) / tilepixels
+        visible = np.nonzero(2.0*radius >= pixel)[0] if lod < maxlod else np.arange(len(records))
+        if len(visible) == 0:
+            continue    #every surface is smaller than a pixel at this lod
+        keys = codes[visible] >> (2*(maxlod-lod))
+        order = np.argsort(keys, kind="mergesort")
+        keys, visible = keys[order], visible[order]
+        starts = np.nonzero(np.r_[True, keys[1:] != keys[:-1]])[0]
+        ends = np.r_[starts[1:], len(keys)]
+        for start, end in zip(starts, ends):
+            members = []
+            for i in visible[start:end]:
+                errors = records[i][4]
+                level = max([k for k in range(len(errors)) if errors[k] <= pixel[i]])
+                members.append((records[i][0], level, records[i][5]))
+            x, y = mortontotilecoord(int(keys[start]), lod)
+            yield lod, x, y, members
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TO CARTESIAN
+#-------------------------------------------------------------------------------
+# Returns the vertices of the mesh in scaled earth centered coordinates
+# relative to offset (scaled, like the virtual camera offset of the viewer).
+def tocartesian(mesh, offset):
+    lng, lat, elv = [float(c) for c in mesh.center]
+    frame = geodeticframe(lng, lat)[localaxes]
+    center = np.array(geodetictocartesian(lng, lat, elv)) / cartesianscale
+    vertices = mesh.vertices.copy()
+    vertices[:,0:3] = np.dot(mesh.vertices[:,0:3], frame) / cartesianscale + (center - offset)
+    if mesh.hasnormals():
+        vertices[:,3:6] = np.dot(mesh.vertices[:,3:6], frame)
+    return vertices
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WRITE TILE
+#-------------------------------------------------------------------------------
+# Writes a geometry tile (Version 1.0) with the meshes as objects. Meshes with
+# more than 65535 vertices are split.
+def writetile(g, meshes, bounds):
+    centers = np.array([geodetictocartesian(*[float(c) for c in mesh.center]) for mesh in meshes])
+    offset = centers.mean(axis=0) / cartesianscale
+    bbmin = np.full(3, np.inf)
+    bbmax = np.full(3, -np.inf)
+    objects = []
+    for mesh in meshes:
+        local = mesh.copy(vertices=tocartesian(mesh, offset))
+        if len(local.vertices) > 0:
+            bbmin = np.minimum(bbmin, local.vertices[:,0:3].min(axis=0) + offset)
+            bbmax = np.maximum(bbmax, local.vertices[:,0:3].max(axis=0) + offset)
+        if len(local.vertices) > maxvertices:
+            objects.extend(splitmesh(local))
+        else:
+            objects.append(local)
+
+    g.write("{\n\"Version\"  :  \"1.0\",")
+    g.write("\n\"Bounds\"  :  ["+",".join([repr(float(c)) for c in bounds])+"],")
+    g.write("\n\"Texture\"  :  \"\",")
+    g.write("\n\"Offset\"  :  ["+",".join([repr(float(c)) for c in offset])+"],")
+    g.write("\n\"BoundingBox\"  :  "+json.dumps([bbmin.tolist(), bbmax.tolist()])+",")
+    g.write("\n\"Objects\"  :  [")
+    for i, mesh in enumerate(objects):
+        if i > 0:
+            g.write(",")
+        g.write("\n{\n\"Texture\"  :  "+json.dumps(mesh.texture or ""))
+        g.write(",\n\"VertexSemantic\"  :  \""+mesh.vertexsemantic+"\",\n\"Vertices\"  :  [\t")
+        writerows(g, mesh.vertices, numberformat, ",\n\t\t\t\t\t")
+        g.write("],\n\"IndexSemantic\"  :  \""+mesh.indexsemantic+"\",\n\"Indices\"  :  [\t")
+        writerows(g, mesh.indices.reshape(-1,3), "%d", ",\n\t\t\t\t")
+        g.write("]\n}")
+    g.write("]\n}")
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: BUILD TILE
+#-------------------------------------------------------------------------------
+# Writes the tile to filename or, if filename is None, returns it as a string
+# (for a tile archive).
+def buildtile(lod, tx, ty, members, filename):
+    g = open(filename, "w") if filename is not None else StringIO()
+    writetile(g, [loadmesh(*member) for member in members], tilebounds(tx, ty, lod))
+    if filename is None:
+        return g.getvalue()
+    g.close()
@@ -0,0 +1,69 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Vertex transformations: centering and axis swapping.
+"""
+
+import numpy as np
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: SWAP AXES
+#-------------------------------------------------------------------------------
+# Returns the columns of the (n,3) array a in the given order, multiplied with
+# signs. E.g. order (1,2,0) and signs (1,-1,1) maps (x,y,z) -> (y,-z,x)
+def swapaxes(a, order=(0,1,2), signs=(1,1,1)):
+    if tuple(order) == (0,1,2) and tuple(signs) == (1,1,1):
+        return a
+    return a[:,list(order)] * np.array(signs, dtype=np.float64)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: CENTROID
+#-------------------------------------------------------------------------------
+def centroid(mesh, bInteger=0):
+    if mesh.centroid is not None:
+        center = np.asarray(mesh.centroid, dtype=np.float64)
+    else:
+        center = mesh.positions().mean(axis=0)
+    if bInteger:
+        center = np.trunc(center)
+    return center
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TRANSFORM
+#-------------------------------------------------------------------------------
+# Sets the center of the mesh to its centroid, subtracts it from the positions
+# if bCalccenter is set and swaps the axes of positions and normals.
+def transform(mesh, bCalccenter=0, order=(0,1,2), signs=(1,1,1), bInteger=0):
+    mesh.center = centroid(mesh, bInteger)
+    vertices = mesh.vertices.copy()
+
+    positions = vertices[:,0:3]
+    if bCalccenter:
+        positions -= mesh.center
+    vertices[:,0:3] = swapaxes(positions, order, signs)
+    if mesh.hasnormals():
+        vertices[:,3:6] = swapaxes(vertices[:,3:6], order, signs)
+
+    mesh.vertices = vertices
+    return mesh
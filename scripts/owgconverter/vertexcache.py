@@ -0,0 +1,155 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Reordering of triangles and vertices for the post-transform vertex cache
+    of the GPU ("Tipsify", Sander, Nehab and Barczak 2007, "Fast Triangle
+    Reordering for Vertex Locality and Reduced Overdraw").
+
+    Tipsify runs in linear time. Its loops work on plain lists, which is much
+    faster in pure Python than accessing numpy arrays element by element.
+"""
+
+import numpy as np
+
+
+cachesize = 24   #vertices in the post-transform cache assumed by tipsify
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: ACMR
+#-------------------------------------------------------------------------------
+# Average cache miss ratio: transformed vertices per triangle with a FIFO cache
+# of size vertices (0.5 is optimal for large grids, 3 the worst).
+def acmr(indices, size=cachesize):
+    indices = np.asarray(indices).tolist()
+    if len(indices) == 0:
+        return 0.0
+    incache = {}
+    time = 0   #number of misses so far
+    for v in indices:
+        if time - incache.get(v, -size-1) > size:
+            incache[v] = time
+            time += 1
+    return float(time) / (len(indices) // 3)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TIPSIFY
+#-------------------------------------------------------------------------------
+# Returns the triangles of indices (flat, TRIANGLES) reordered for a cache of
+# size vertices.
+def tipsify(indices, numvertices, size=cachesize):
+    indices = np.asarray(indices, dtype=np.int64)
+    numtriangles = len(indices) // 3
+    # vertex -> triangles (compressed rows)
+    order = np.argsort(indices, kind="mergesort")
+    offsets = np.r_[0, np.cumsum(np.bincount(indices, minlength=numvertices))].tolist()
+    adjacency = (order // 3).tolist()
+    live = np.bincount(indices, minlength=numvertices).tolist()
+    tri = indices.tolist()
+
+    timestamps = [0] * numvertices
+    emitted = [False] * numtriangles
+    output = []
+    deadend = []
+    fanning = 0
+    time = size + 1
+    cursor = 1
+    while fanning >= 0:
+        candidates = []
+        for t in adjacency[offsets[fanning]:offsets[fanning+1]]:
+            if emitted[t]:
+                continue
+            emitted[t] = True
+            for v in tri[3*t:3*t+3]:
+                output.append(v)
+                deadend.append(v)
+                candidates.append(v)
+                live[v] -= 1
+                if time - timestamps[v] > size:
+                    timestamps[v] = time
+                    time += 1
+
+        # next fanning vertex: a candidate still in the cache after fanning it
+        fanning = -1
+        best = -1
+        for v in candidates:
+            if live[v] > 0:
+                priority = 0
+                if time - timestamps[v] + 2 * live[v] <= size:
+                    priority = time - timestamps[v]
+                if priority > best:
+                    best = priority
+                    fanning = v
+        if fanning < 0:
+            # dead end: recently used vertices, then the next unprocessed one
+            while len(deadend) > 0:
+                v = deadend.pop()
+                if live[v] > 0:
+                    fanning = v
+                    break
+        if fanning < 0:
+            while cursor < numvertices:
+                if live[cursor] > 0:
+                    fanning = cursor
+                    break
+                cursor += 1
+    return np.array(output, dtype=np.int64)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: OPTIMIZE VERTEX CACHE
+#-------------------------------------------------------------------------------
+# Reorders the triangles of the mesh (of every cluster) with tipsify and its
+# vertices in the order of their first use (locality of the vertex fetches).
+# Returns the new mesh and the ACMR before and after.
+def optimizevertexcache(mesh, size=cachesize):
+    if mesh.indexsemantic != "TRIANGLES" or len(mesh.indices) == 0:
+        return mesh, 0.0, 0.0
+    before = acmr(mesh.indices, size)
+    if mesh.clusters is None:
+        indices = tipsify(mesh.indices, len(mesh.vertices), size)
+    else:
+        #the triangles stay in their clusters
+        parts = []
+        for first, count in mesh.clusters[:,0:2].astype(np.int64).tolist():
+            used, local = np.unique(mesh.indices[first:first+count], return_inverse=True)
+            parts.append(used[tipsify(local.reshape(-1), len(used), size)])
+        indices = np.concatenate(parts)
+    unique, first, inverse = np.unique(indices, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    clusters = mesh.clusters
+    mesh = mesh.copy(vertices=mesh.vertices[unique[order]], indices=rank[inverse.reshape(-1)])
+    mesh.clusters = clusters
+    return mesh, before, acmr(mesh.indices, size)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: OPTIMIZE SURFACES
+#-------------------------------------------------------------------------------
+# Generator, optimizes the meshes (after welding and splitting) one by one.
+def optimizesurfaces(meshes, size=cachesize):
+    for mesh in meshes:
+        mesh, before, after = optimizevertexcache(mesh, size)
+        print('vertex cache: ACMR ' + ('%.3f' % before) + ' -> ' + ('%.3f' % after))
+        yield mesh
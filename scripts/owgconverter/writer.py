@@ -0,0 +1,196 @@
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                        3D Object Converter Library                           #
+#                               Version 1.1.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Writers for the json geometry exchange format (documentation/JSON_Geometry.txt)
+    and the binary geometry format (documentation/Binary_Geometry.txt).
+"""
+
+import os
+import os.path
+import struct
+import numpy as np
+
+
+numberformat = "%.12g"
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TEMP NAME / FINISH OUTPUT
+#-------------------------------------------------------------------------------
+# The converters write to tempname(output) and call finishoutput afterwards,
+# which renames the temporary files to the outputs if bOk and removes them
+# otherwise, so a failed conversion leaves no truncated output behind.
+def tempname(filename):
+    return filename + ".tmp"
+
+
+def finishoutput(filenames, bOk):
+    for filename in filenames:
+        if not os.path.isfile(tempname(filename)):
+            continue
+        if bOk:
+            if os.path.isfile(filename):
+                os.remove(filename)
+            os.rename(tempname(filename), filename)
+        else:
+            os.remove(tempname(filename))
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WRITE ROWS
+#-------------------------------------------------------------------------------
+# Formats the rows of a 2D array blockwise so the strings only exist at write
+# time and never for the whole array at once.
+def writerows(g, rows, fmt, separator, blocksize=65536):
+    rowformat = ",".join([fmt]*rows.shape[1])
+    for start in range(0, len(rows), blocksize):
+        if start > 0:
+            g.write(separator)
+        block = rows[start:start+blocksize].tolist()
+        g.write(separator.join([rowformat % tuple(row) for row in block]))
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WRITE SURFACE
+#-------------------------------------------------------------------------------
+def writesurface(g, mesh):
+    g.write("{\n\"id\"  :  \""+str(mesh.id)+"\",")
+    g.write("\n\"Center\"  :  ["+",".join([repr(float(c)) for c in mesh.center])+"],")
+    if mesh.visibilitydistance is not None:
+        g.write("\n\"VisibilityDistance\"  :  "+(numberformat % mesh.visibilitydistance)+",")
+    if mesh.minvisibilitydistance is not None:
+        g.write("\n\"MinVisibilityDistance\"  :  "+(numberformat % mesh.minvisibilitydistance)+",")
+    if mesh.texture is not None:
+        g.write("\n\"DiffuseMap\"  :  \""+str(mesh.texture)+"\",")
+    if mesh.clusters is not None:
+        g.write("\n\"Clusters\"  :  [\t[")
+        writerows(g, mesh.clusters, numberformat, "],\n\t\t\t\t[")
+        g.write("]],")
+    g.write("\n\"VertexSemantic\"  :  \""+mesh.vertexsemantic+"\",\n\"Vertices\"  :  [\t")
+    writerows(g, mesh.vertices, numberformat, ",\n\t\t\t\t\t")
+    g.write("],\n\"IndexSemantic\"  :  \""+mesh.indexsemantic+"\",\n\"Indices\"  :  [\t")
+    writerows(g, mesh.indices.reshape(-1,3), "%d", ",\n\t\t\t\t")
+    g.write("]\n\n}")
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WRITE JSON
+#-------------------------------------------------------------------------------
+# meshes is a sequence (or generator) of meshes, every mesh a sequence of
+# surfaces. They are written as they come, nothing is held back.
+def writejson(g, meshes):
+    g.write("[")
+    for i, surfaces in enumerate(meshes):
+        if i > 0:
+            g.write(",")
+        g.write("[")
+        for j, surface in enumerate(surfaces):
+            if j > 0:
+                g.write(",")
+            writesurface(g, surface)
+        g.write("]")
+    g.write("]")
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: OCTAHEDRON ENCODE
+#-------------------------------------------------------------------------------
+# Maps unit normals (n,3) to the octahedron and returns them as (n,2) int8.
+def octahedronencode(normals):
+    normals = np.asarray(normals, dtype=np.float64)
+    p = normals[:,0:2] / np.maximum(np.abs(normals).sum(axis=1), 1e-30)[:,None]
+    lower = normals[:,2] < 0
+    signs = np.where(p[lower] >= 0, 1.0, -1.0)
+    p[lower] = (1.0 - np.abs(p[lower][:,::-1])) * signs
+    return np.round(np.clip(p, -1.0, 1.0) * 127.0).astype(np.int8)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: QUANTIZE POSITIONS
+#-------------------------------------------------------------------------------
+# Returns (q, offset, scale) with positions ~ offset + q * scale, q int16
+# relative to the center of the bounding box, one scale for all axes.
+def quantizepositions(positions):
+    if len(positions) == 0:
+        return np.zeros((0,3), dtype="<i2"), np.zeros(3), 1.0
+    pmin = positions.min(axis=0)
+    pmax = positions.max(axis=0)
+    offset = 0.5 * (pmin + pmax)
+    scale = max(0.5 * float(np.max(pmax - pmin)), 1e-30) / 32767.0
+    q = np.clip(np.round((positions - offset) / scale), -32767, 32767)
+    return q.astype("<i2"), offset, scale
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WRITE BINARY SURFACE
+#-------------------------------------------------------------------------------
+# Writes a surface in the binary geometry format 1.0, or with bQuantize in the
+# quantized format 1.1. g must be opened in binary mode.
+def writebinarysurface(g, mesh, bQuantize=0):
+    if len(mesh.vertices) > 65536:
+        raise ValueError("binary surfaces are limited to 65536 vertices (16 bit indices)")
+    header = struct.pack("<4sBBxx", b"OWGM", 1, 1 if bQuantize else 0)
+    header += struct.pack("<3d", *[float(c) for c in mesh.center])
+    header += struct.pack("<II", len(mesh.vertices), len(mesh.indices))
+    for text in [mesh.vertexsemantic, mesh.indexsemantic, mesh.texture or ""]:
+        text = text.encode("utf-8")
+        header += struct.pack("<H", len(text)) + text
+    header += b"\0" * (-len(header) % 4)
+    g.write(header)
+    if bQuantize:
+        writequantizedvertices(g, mesh)
+    else:
+        g.write(np.ascontiguousarray(mesh.vertices, dtype="<f4").tobytes())
+    g.write(np.ascontiguousarray(mesh.indices, dtype="<u2").tobytes())
+    if len(mesh.indices) % 2 == 1:
+        g.write(b"\0\0")
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WRITE QUANTIZED VERTICES
+#-------------------------------------------------------------------------------
+# Vertex blocks of the binary geometry format 1.1: positions int16 relative to
+# the center of their bounding box with one scale, normals octahedron encoded
+# int8[2], colors uint8[4], texcoords uint16[2] in their range. Every block is
+# padded to 4 bytes.
+def writequantizedvertices(g, mesh):
+    vertices = np.asarray(mesh.vertices, dtype=np.float64)
+    semantic = mesh.vertexsemantic
+    positions, poffset, pscale = quantizepositions(vertices[:,0:3])
+    column = 3
+    blocks = [positions]
+    if "n" in semantic:
+        blocks.append(octahedronencode(vertices[:,column:column+3]))
+        column += 3
+    if "c" in semantic:
+        blocks.append(np.round(np.clip(vertices[:,column:column+4], 0.0, 1.0) * 255.0).astype(np.uint8))
+        column += 4
+    toffset = tscale = np.zeros(2)
+    if "t" in semantic:
+        texcoords = vertices[:,column:column+2]
+        toffset = texcoords.min(axis=0) if len(texcoords) > 0 else np.zeros(2)
+        tscale = texcoords.max(axis=0) - toffset if len(texcoords) > 0 else np.zeros(2)
+        tscale = np.where(tscale > 0, tscale, 1.0) / 65535.0
+        blocks.append(np.clip(np.round((texcoords - toffset) / tscale), 0, 65535).astype("<u2"))
+    g.write(struct.pack("<3ff2f2f", *([float(c) for c in poffset] + [float(pscale)] + [float(c) for c in toffset] + [float(c) for c in tscale])))
+    for block in blocks:
+        data = np.ascontiguousarray(block).tobytes()
+        g.write(data + b"\0" * (-len(data) % 4))
@@ -0,0 +1,302 @@
+#!/usr/bin/python
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                         Point Cloud Tile Generator                           #
+#                               Version 1.0.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Writes the tile pyramid of an owg point cloud layer from ascii point files
+    (x y z [r g b [a]] per line) or numpy dumps (.npy):
+
+        output/layer/tiles/lod/x/y.bin
+        output/layer/layersettings.json
+
+    With --archive the tiles are written into one archive
+    output/layer/tiles.owgt instead of the tile tree, to copy the layer to a
+    server, where "tile_archive.py --unpack" writes the tile tree. The viewer
+    reads the tile tree only.
+
+    x, y are WGS84 longitude and latitude or coordinates in --srs, z is the
+    ellipsoidal height. Every tile holds at most --maxpoints points, thinned
+    with a voxel grid, so coarse levels stay small.
+
+    Add the layer with {"service" : "owg", "url" : ["http://server/output"],
+    "layer" : "layer", "static" : true, "minlod" : minlod, "maxlod" : maxlod}.
+"""
+
+import sys
+import os
+import os.path
+import glob
+import json
+import shutil
+import tempfile
+import multiprocessing
+from compress import findfiles, compressfiles
+from owgconverter import readxyz, readnpy, pointblock, sortrecords, tileranges, buildpointtile, buildparenttile, imapbounded
+from owgconverter import TileArchiveWriter
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: FIND SOURCES
+#-------------------------------------------------------------------------------
+# source is a file, a directory (searched recursively) or a glob pattern
+def findsources(source):
+    files = []
+    if os.path.isdir(source):
+        for dirname, dirnames, filenames in os.walk(source):
+            for f in filenames:
+                files.append(os.path.join(dirname, f))
+    else:
+        files = glob.glob(source)
+    return sorted([f for f in files if os.path.splitext(f)[1].lower() in [".xyz", ".txt", ".npy"]])
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: READ BLOCKS
+#-------------------------------------------------------------------------------
+# yields (values, maxlod, srs) for blocks of points of all files
+def readblocks(filenames, maxlod, srs):
+    for filename in filenames:
+        if os.path.splitext(filename)[1].lower() == ".npy":
+            for values in readnpy(filename):
+                yield values, maxlod, srs
+        else:
+            f = open(filename, "r")
+            for values in readxyz(f):
+                yield values, maxlod, srs
+            f.close()
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: BLOCK JOB (runs in the worker processes)
+#-------------------------------------------------------------------------------
+def blockjob(job):
+    return pointblock(*job)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE NAME
+#-------------------------------------------------------------------------------
+def tilename(output, lod, tx, ty):
+    return os.path.join(output, str(lod), str(tx), str(ty) + ".bin")
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: MAKE DIRS
+#-------------------------------------------------------------------------------
+def makedirs(filename):
+    dirname = os.path.dirname(filename)
+    try:
+        os.makedirs(dirname)
+    except OSError:
+        if not os.path.isdir(dirname):
+            raise
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE JOB (runs in the worker processes)
+#-------------------------------------------------------------------------------
+# finest level: points start:end of the sorted points
+def tilejob(job):
+    filename, sortedfile, start, end, maxpoints, bAverage = job
+    makedirs(filename)
+    return buildpointtile(sortedfile, start, end, maxpoints, filename, bAverage)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: PARENT JOB (runs in the worker processes)
+#-------------------------------------------------------------------------------
+# coarser levels: thinned from the tiles of the next finer level
+def parentjob(job):
+    filename, childfiles, maxpoints, bAverage = job
+    makedirs(filename)
+    return buildparenttile(childfiles, maxpoints, filename, bAverage)
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: PACK LEVEL
+#-------------------------------------------------------------------------------
+# Adds the tiles of one level to the archive and removes their files, once the
+# next coarser level is built from them.
+def packlevel(writer, tilesdir, lod, tiles):
+    for tx, ty in tiles:
+        f = open(tilename(tilesdir, lod, tx, ty), "rb")
+        writer.add(lod, tx, ty, f.read())
+        f.close()
+    if os.path.isdir(os.path.join(tilesdir, str(lod))):
+        shutil.rmtree(os.path.join(tilesdir, str(lod)))
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: TILE
+#-------------------------------------------------------------------------------
+def tile(filenames, output, layer, minlod, maxlod, maxpoints=40000, bAverage=0, srs=None, numjobs=None, bCompress=0, bArchive=0):
+    numjobs = max(numjobs or multiprocessing.cpu_count(), 1)
+    layerdir = os.path.join(output, layer)
+    cachedir = tempfile.mkdtemp(prefix="owgpoints")
+    recordfile = os.path.join(cachedir, "points.raw")
+    sortedfile = os.path.join(cachedir, "sorted.raw")
+    makedirs(os.path.join(layerdir, "layersettings.json"))
+    writer = None
+    if bArchive:
+        #the tiles of at most two levels exist as files (in the cache directory)
+        writer = TileArchiveWriter(os.path.join(layerdir, "tiles.owgt"), "bin")
+    pool = multiprocessing.Pool(numjobs)
+    try:
+        #pass 1: convert the points to cartesian records with the key of their maxlod tile
+        numpoints = 0
+        g = open(recordfile, "wb")
+        for records in imapbounded(pool, blockjob, readblocks(filenames, maxlod, srs), 2*numjobs):
+            g.write(records.tobytes())
+            numpoints += len(records)
+        g.close()
+        print(str(numpoints) + ' points read')
+        #no points: an empty layer with the extent of geometry_tiler.py
+        extent = [0, 0, 0, 0]
+        tilesdir = os.path.join(layerdir if not bArchive else cachedir, "tiles")
+        if numpoints > 0:
+            #pass 2: sort by key (external merge sort), then every tile of maxlod is
+            #a contiguous range of points
+            keys, counts = sortrecords(recordfile, sortedfile)
+            os.remove(recordfile)
+            ranges = list(tileranges(keys, counts, maxlod, maxlod))
+            jobs = [(tilename(tilesdir, lod, tx, ty), sortedfile, start, end, maxpoints, bAverage) for lod, tx, ty, start, end in ranges]
+            numpoints = sum(pool.imap_unordered(tilejob, jobs, 16))
+            print('lod ' + str(maxlod) + ': ' + str(len(jobs)) + ' tiles, ' + str(numpoints) + ' points')
+
+            #pass 3: the coarser levels, each one from the tiles of the previous one
+            tiles = [(tx, ty) for lod, tx, ty, start, end in ranges]
+            extent = [min([t[0] for t in tiles]), min([t[1] for t in tiles]), max([t[0] for t in tiles]), max([t[1] for t in tiles])]
+            for lod in range(maxlod-1, minlod-1, -1):
+                children = {}
+                for tx, ty in tiles:
+                    children.setdefault((tx >> 1, ty >> 1), []).append(tilename(tilesdir, lod+1, tx, ty))
+                childtiles = tiles
+                tiles = sorted(children.keys())
+                jobs = [(tilename(tilesdir, lod, tx, ty), children[(tx, ty)], maxpoints, bAverage) for tx, ty in tiles]
+                numpoints = sum(pool.imap_unordered(parentjob, jobs, 16))
+                print('lod ' + str(lod) + ': ' + str(len(jobs)) + ' tiles, ' + str(numpoints) + ' points')
+                if writer is not None:
+                    packlevel(writer, tilesdir, lod+1, childtiles)
+            if writer is not None:
+                packlevel(writer, tilesdir, minlod, tiles)
+        if writer is not None:
+            writer.close()
+            print(str(len(writer.tiles)) + ' tiles written to tiles.owgt')
+        if bCompress:
+            print(str(compressfiles(findfiles(tilesdir), pool)) + ' compressed files written')
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        shutil.rmtree(cachedir)
+
+    settings = {"name" : layer, "type" : "pointcloud", "format" : "bin", "minlod" : minlod, "maxlod" : maxlod, "extent" : extent}
+    g = open(os.path.join(layerdir, "layersettings.json"), "w")
+    json.dump(settings, g)
+    g.close()
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print('usage:\n')
+        print('--source file.xyz, file.npy, directory or "pattern*.xyz"')
+        print('--output directory')
+        print('--layer name')
+        print('--minlod n (default: 12)')
+        print('--maxlod n (default: 18)')
+        print('--maxpoints n (points per tile, default: 40000)')
+        print('--average (thinned points are the mean of their voxel instead of its first point)')
+        print('--srs epsg:21781 (if x, y are not WGS84)')
+        print('--compress (also write .gz and .br copies of the tiles)')
+        print('--archive (write the tiles into one archive tiles.owgt instead, unpack it with tile_archive.py)')
+        print('--jobs n (default: number of cores)')
+        print('\nexample: pointcloud_tiler.py --source scan.xyz --output tiles --layer scan --minlod 12 --maxlod 18')
+        sys.exit()
+
+    source = ""
+    output = ""
+    layer = ""
+    minlod = 12
+    maxlod = 18
+    maxpoints = 40000
+    bAverage = 0
+    bCompress = 0
+    bArchive = 0
+    srs = None
+    numjobs = None
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == '--source' and i+1 < len(sys.argv):
+            i += 1
+            source = sys.argv[i]
+        elif sys.argv[i] == '--output' and i+1 < len(sys.argv):
+            i += 1
+            output = sys.argv[i]
+        elif sys.argv[i] == '--layer' and i+1 < len(sys.argv):
+            i += 1
+            layer = sys.argv[i]
+        elif sys.argv[i] == '--minlod' and i+1 < len(sys.argv):
+            i += 1
+            minlod = int(sys.argv[i])
+        elif sys.argv[i] == '--maxlod' and i+1 < len(sys.argv):
+            i += 1
+            maxlod = int(sys.argv[i])
+        elif sys.argv[i] == '--maxpoints' and i+1 < len(sys.argv):
+            i += 1
+            maxpoints = int(sys.argv[i])
+        elif sys.argv[i] == '--srs' and i+1 < len(sys.argv):
+            i += 1
+            srs = sys.argv[i]
+        elif sys.argv[i] == '--jobs' and i+1 < len(sys.argv):
+            i += 1
+            numjobs = int(sys.argv[i])
+        elif sys.argv[i] == '--average':
+            bAverage = 1
+        elif sys.argv[i] == '--compress':
+            bCompress = 1
+        elif sys.argv[i] == '--archive':
+            bArchive = 1
+        i += 1
+
+    if source == "" or output == "" or layer == "":
+        print('Error: please specify --source, --output and --layer')
+        sys.exit()
+
+    if minlod < 1 or minlod > maxlod or maxlod > 30 or maxpoints < 1:
+        print('Error: 1 <= minlod <= maxlod <= 30 and maxpoints >= 1')
+        sys.exit()
+
+    filenames = findsources(source)
+    print('Source: ' + source + ' (' + str(len(filenames)) + ' files)')
+    print('Output: ' + os.path.join(output, layer) + ', lod ' + str(minlod) + ' to ' + str(maxlod))
+
+    if bArchive and bCompress:
+        print('--compress is ignored with --archive')
+        bCompress = 0
+
+    tile(filenames, output, layer, minlod, maxlod, maxpoints, bAverage, srs, numjobs, bCompress, bArchive)
+
+    print("tiling successfully finished...")
@@ -0,0 +1,174 @@
+#!/usr/bin/python
+"""
+   Tests download_external.py against the local stand-in server of
+   download_server.py: interrupted and resumed download, a complete part
+   (416 Range Not Satisfiable), a digest mismatch, --mirror and the digest
+   recorded by the first download without a pinned one.
+
+   Every test runs download_external.py in its own temporary directory
+   (work/scripts, the files are extracted to work/). Run it with
+   "python test_download_external.py" or with pytest.
+"""
+
+import sys
+import os
+import os.path
+import io
+import shutil
+import hashlib
+import tarfile
+import tempfile
+import subprocess
+from download_server import StandInServer
+
+script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "download_external.py")
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: MAKE ARCHIVE
+#-------------------------------------------------------------------------------
+# external.tar.gz with one file of incompressible data (several download chunks)
+def makearchive():
+   content = os.urandom(300000)
+   buffer = io.BytesIO()
+   tar = tarfile.open(fileobj=buffer, mode="w:gz")
+   info = tarfile.TarInfo("external/data.bin")
+   info.size = len(content)
+   tar.addfile(info, io.BytesIO(content))
+   tar.close()
+   return buffer.getvalue(), content
+
+archive, content = makearchive()
+digest = hashlib.sha256(archive).hexdigest()
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: RUN
+#-------------------------------------------------------------------------------
+# runs download_external.py in workdir/scripts, returns (exit code, output)
+def run(workdir, args):
+   cwd = os.path.join(workdir, "scripts")
+   if not os.path.isdir(cwd):
+      os.makedirs(cwd)
+   p = subprocess.Popen([sys.executable, script] + args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+   output = p.communicate()[0].decode("utf-8", "replace")
+   return p.returncode, output
+
+
+def installed(workdir):
+   filename = os.path.join(workdir, "external", "data.bin")
+   if not os.path.isfile(filename):
+      return False
+   f = open(filename, "rb")
+   data = f.read()
+   f.close()
+   return data == content
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: WITH SERVER
+#-------------------------------------------------------------------------------
+# calls test(server, workdir) with a running stand-in and a temporary directory
+def withserver(test, dropcount=0, dropafter=0):
+   server = StandInServer(archive, dropcount=dropcount, dropafter=dropafter)
+   server.start()
+   workdir = tempfile.mkdtemp(prefix="owgdownload")
+   try:
+      test(server, workdir)
+   finally:
+      server.stop()
+      shutil.rmtree(workdir)
+
+
+#-------------------------------------------------------------------------------
+# TESTS
+#-------------------------------------------------------------------------------
+def test_resume():
+   def test(server, workdir):
+      code, output = run(workdir, ["--url", server.url(), "--sha256", digest])
+      assert code == 1, output
+      part = os.path.join(workdir, "scripts", "external.tar.gz.part")
+      assert 0 < os.path.getsize(part) < len(archive)
+      assert not installed(workdir)
+      code, output = run(workdir, ["--url", server.url(), "--sha256", digest])
+      assert code == 0, output
+      assert server.requests[-1] == (server.path, "bytes=" + str(100000) + "-", 206), server.requests
+      assert installed(workdir)
+      assert not os.path.exists(part)
+      marker = os.path.join(workdir, "scripts", "external.tar.gz.extracted")
+      assert open(marker).read().strip() == digest
+   withserver(test, dropcount=1, dropafter=100000)
+
+
+def test_complete_part():
+   def test(server, workdir):
+      os.makedirs(os.path.join(workdir, "scripts"))
+      g = open(os.path.join(workdir, "scripts", "external.tar.gz.part"), "wb")
+      g.write(archive)
+      g.close()
+      code, output = run(workdir, ["--url", server.url(), "--sha256", digest])
+      assert code == 0, output
+      assert server.requests == [(server.path, "bytes=" + str(len(archive)) + "-", 416)], server.requests
+      assert installed(workdir)
+   withserver(test)
+
+
+def test_mismatch():
+   def test(server, workdir):
+      code, output = run(workdir, ["--url", server.url(), "--sha256", "0" * 64])
+      assert code == 1, output
+      assert "checksum mismatch" in output
+      assert not installed(workdir)
+      assert os.listdir(os.path.join(workdir, "scripts")) == []
+      assert sorted(os.listdir(workdir)) == ["scripts"]
+   withserver(test)
+
+
+def test_mirror():
+   def test(server, workdir):
+      mirror = os.path.join(workdir, "mirror")
+      for node in ["node1", "node2"]:
+         code, output = run(os.path.join(workdir, node), ["--url", server.url(), "--sha256", digest, "--mirror", mirror])
+         assert code == 0, output
+         assert installed(os.path.join(workdir, node))
+      assert len(server.requests) == 1, server.requests
+      assert sorted(os.listdir(mirror)) == ["external.tar.gz", "external.tar.gz.sha256"]
+   withserver(test)
+
+
+def test_unpinned():
+   def test(server, workdir):
+      scripts = os.path.join(workdir, "scripts")
+      code, output = run(workdir, ["--url", server.url()])
+      assert code == 0, output
+      assert installed(workdir)
+      assert open(os.path.join(scripts, "external.tar.gz.sha256")).read().strip() == digest
+      #a changed archive does not match the digest recorded by the first download
+      server.data = makearchive()[0]
+      os.remove(os.path.join(scripts, "external.tar.gz"))
+      code, output = run(workdir, ["--url", server.url()])
+      assert code == 1, output
+      assert "checksum mismatch" in output
+      assert installed(workdir)
+      code, output = run(workdir, ["--url", server.url(), "--insecure"])
+      assert code == 0, output
+      assert not installed(workdir)
+      assert open(os.path.join(scripts, "external.tar.gz.sha256")).read().strip() == digest
+   withserver(test)
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+   tests = [test_resume, test_complete_part, test_mismatch, test_mirror, test_unpinned]
+   failed = 0
+   for test in tests:
+      try:
+         test()
+         print("ok     " + test.__name__)
+      except AssertionError as e:
+         print("FAILED " + test.__name__ + ": " + str(e))
+         failed += 1
+   print(str(len(tests) - failed) + " of " + str(len(tests)) + " tests passed")
+   sys.exit(1 if failed else 0)
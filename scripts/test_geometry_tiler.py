@@ -0,0 +1,107 @@
+#!/usr/bin/python
+"""
+   Tests the tile pyramid of geometry_tiler.py: a building sized surface is
+   smaller than a pixel at the coarse lods, those levels get no tiles. With
+   --archive the same tiles are written into tiles.owgt instead of the tree.
+
+   Run it with "python test_geometry_tiler.py" or with pytest.
+"""
+
+import sys
+import os
+import os.path
+import json
+import shutil
+import tempfile
+from owgconverter import tilejobs, TileArchive
+import geometry_tiler
+
+
+#-------------------------------------------------------------------------------
+# FUNCTION: BUILDING
+#-------------------------------------------------------------------------------
+# a 20 m box (two triangles per side would do, the tiler only needs its size)
+def building():
+   vertices = []
+   for x in [-10, 10]:
+      for y in [-10, 10]:
+         for z in [0, 20]:
+            vertices.extend([x, y, z, 1, 1, 1, 1])
+   indices = [0,1,3, 0,3,2, 4,6,7, 4,7,5, 0,4,5, 0,5,1, 2,3,7, 2,7,6, 0,2,6, 0,6,4, 1,5,7, 1,7,3]
+   return {"VertexSemantic" : "pc", "Vertices" : vertices, "IndexSemantic" : "TRIANGLES",
+           "Indices" : indices, "Center" : [7.65, 47.53, 300.0]}
+
+
+#-------------------------------------------------------------------------------
+# TESTS
+#-------------------------------------------------------------------------------
+def test_empty_coarse_levels():
+   records = [("cache", 7.65, 47.53, 15.0, [0.0], None)]
+   lods = [lod for lod, tx, ty, members in tilejobs(records, 1, 14)]
+   assert lods[0] == 14, lods
+   assert 1 not in lods, lods
+   assert lods == sorted(set(lods), reverse=True), lods
+
+
+def test_tile_building():
+   workdir = tempfile.mkdtemp(prefix="owgtilertest")
+   try:
+      source = os.path.join(workdir, "a.json")
+      g = open(source, "w")
+      json.dump([[building()]], g)
+      g.close()
+      output = os.path.join(workdir, "gt")
+      geometry_tiler.tile([source], output, "l", 10, 14, 1)
+      f = open(os.path.join(output, "l", "layersettings.json"))
+      settings = json.load(f)
+      f.close()
+      assert settings["extent"][0] <= settings["extent"][2], settings
+      lods = sorted(os.listdir(os.path.join(output, "l", "tiles")))
+      assert "14" in lods and "10" not in lods, lods
+   finally:
+      shutil.rmtree(workdir)
+
+
+def test_archive():
+   workdir = tempfile.mkdtemp(prefix="owgtilertest")
+   try:
+      source = os.path.join(workdir, "a.json")
+      g = open(source, "w")
+      json.dump([[building()]], g)
+      g.close()
+      geometry_tiler.tile([source], os.path.join(workdir, "tree"), "l", 10, 14, 1)
+      geometry_tiler.tile([source], os.path.join(workdir, "archive"), "l", 10, 14, 1, bArchive=1)
+      layerdir = os.path.join(workdir, "archive", "l")
+      assert sorted(os.listdir(layerdir)) == ["layersettings.json", "tiles.owgt"]
+      archive = TileArchive(os.path.join(layerdir, "tiles.owgt"))
+      tiles = list(archive.tiles())
+      assert len(tiles) > 0
+      for lod, tx, ty in tiles:
+         f = open(os.path.join(workdir, "tree", "l", "tiles", str(lod), str(tx), str(ty) + ".json"), "rb")
+         data = f.read()
+         f.close()
+         tile = archive.gettile(lod, tx, ty)
+         assert tile.tobytes() == data, (lod, tx, ty)
+         del tile
+      archive.close()
+      count = sum([len(filenames) for dirname, dirnames, filenames in os.walk(os.path.join(workdir, "tree", "l", "tiles"))])
+      assert count == len(tiles), (count, len(tiles))
+   finally:
+      shutil.rmtree(workdir)
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+   tests = [test_empty_coarse_levels, test_tile_building, test_archive]
+   failed = 0
+   for test in tests:
+      try:
+         test()
+         print("ok     " + test.__name__)
+      except AssertionError as e:
+         print("FAILED " + test.__name__ + ": " + str(e))
+         failed += 1
+   print(str(len(tests) - failed) + " of " + str(len(tests)) + " tests passed")
+   sys.exit(1 if failed else 0)
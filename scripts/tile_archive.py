@@ -0,0 +1,72 @@
+#!/usr/bin/python
+################################################################################
+#      ____               __          __  _      _____ _       _               #
+#     / __ \              \ \        / / | |    / ____| |     | |              #
+#    | |  | |_ __   ___ _ __ \  /\  / /__| |__ | |  __| | ___ | |__   ___      #
+#    | |  | | '_ \ / _ \ '_ \ \/  \/ / _ \ '_ \| | |_ | |/ _ \| '_ \ / _ \     #
+#    | |__| | |_) |  __/ | | \  /\  /  __/ |_) | |__| | | (_) | |_) |  __/     #
+#     \____/| .__/ \___|_| |_|\/  \/ \___|_.__/ \_____|_|\___/|_.__/ \___|     #
+#           | |                                                                #
+#           |_|                                                                #
+#                                                                              #
+#                              Tile Archive Tool                               #
+#                               Version 1.0.0                                  #
+#                                                                              #
+#                              (c) 2010-2011 by                                #
+#           University of Applied Sciences Northwestern Switzerland            #
+#                     Institute of Geomatics Engineering                       #
+#                           martin.christen@fhnw.ch                            #
+################################################################################
+#     Licensed under MIT License. Read the file LICENSE for more information   @
+################################################################################
+"""
+    Packs a tile tree (output/layer/tiles/lod/x/y.json, written by the tilers)
+    into one tile archive and unpacks an archive to a tile tree again
+    (documentation/Tile_Archive.txt).
+"""
+
+import sys
+from owgconverter import ConversionError, packtiles, unpacktiles
+
+
+#-------------------------------------------------------------------------------
+# MAIN
+#-------------------------------------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print('usage:\n')
+        print('--pack directory (tile tree lod/x/y.ext)')
+        print('--unpack archive.owgt')
+        print('--output archive.owgt (--pack) or directory (--unpack)')
+        print('\nexample: tile_archive.py --pack tiles/dhm25/tiles --output tiles/dhm25/tiles.owgt')
+        sys.exit()
+
+    pack = ""
+    unpack = ""
+    output = ""
+
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] == '--pack' and i+1 < len(sys.argv):
+            i += 1
+            pack = sys.argv[i]
+        elif sys.argv[i] == '--unpack' and i+1 < len(sys.argv):
+            i += 1
+            unpack = sys.argv[i]
+        elif sys.argv[i] == '--output' and i+1 < len(sys.argv):
+            i += 1
+            output = sys.argv[i]
+        i += 1
+
+    if (pack == "") == (unpack == "") or output == "":
+        print('Error: please specify --pack or --unpack and --output')
+        sys.exit()
+
+    try:
+        if pack != "":
+            print(str(packtiles(pack, output)) + ' tiles packed into ' + output)
+        else:
+            print(str(unpacktiles(unpack, output)) + ' tiles unpacked to ' + output)
+    except ConversionError as e:
+        print("failed: " + str(e))
+        sys.exit(1)
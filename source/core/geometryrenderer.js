@@ -91,7 +91,8 @@ GeometryRenderer.prototype.Render = function(vCameraPosition, matModelViewProjec
                   var dz = (surface.bbmin[2]-z);
                   var dis_squared = dx*dx + dy*dy + dz*dz;
                   var disLimit = surface.visibilityDistance * surface.visibilityDistance;
-                  if(!this.frustum.TestBox(surface.bbmin[0],surface.bbmin[1],surface.bbmin[2],surface.bbmax[0],surface.bbmax[1],surface.bbmax[2]) || dis_squared>disLimit)
+                  var disLimitMin = surface.minVisibilityDistance * surface.minVisibilityDistance;
+                  if(!this.frustum.TestBox(surface.bbmin[0],surface.bbmin[1],surface.bbmin[2],surface.bbmax[0],surface.bbmax[1],surface.bbmax[2]) || dis_squared>disLimit || dis_squared<disLimitMin)
                   {
                     // return;   
                   }
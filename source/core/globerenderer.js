@@ -54,6 +54,7 @@ var ElevationLayerOptions;
  * @typedef {{
  *     url     : Array.<string>,
  *     service : string,
+ *     layer   : (string|undefined),
  *     minlod  : number,
  *     maxlod  : number
  * }}
@@ -65,6 +66,7 @@ var GeometryLayerOptions;
  *     url     : Array.<string>,
  *     service : string,
  *     layer   : string,
+ *     static  : (boolean|undefined),
  *     minlod  : number,
  *     maxlod  : number
  * }}
@@ -454,10 +456,11 @@ GlobeRenderer.prototype.AddGeometryLayer = function(options)
             var servers = options["url"];
             var minlod = options["minlod"];
             var maxlod = options["maxlod"];
+            var layer = options["layer"];   // optional: static tiles of scripts/geometry_tiler.py
 
             // Create OpenWebGlobe Geometry layer:
             var geomLayer = new owgGeometryLayer();
-            geomLayer.Setup(servers, minlod, maxlod);
+            geomLayer.Setup(servers, minlod, maxlod, layer);
             index = this.geometrylayerlist.length;
             this.geometrylayerlist.push(geomLayer);
             this._UpdateLayers();
@@ -488,10 +491,11 @@ GlobeRenderer.prototype.AddPointCloudLayer = function(options)
                 var minlod = options["minlod"];
                 var maxlod = options["maxlod"];
                 var layer = options["layer"];
+                var bStatic = options["static"];   // optional: static tiles of scripts/pointcloud_tiler.py
 
                 // Create OpenWebGlobe pointcloud layer:
                 var pcLayer = new owgPointCloudLayer();
-                pcLayer.Setup(servers, layer, minlod, maxlod);
+                pcLayer.Setup(servers, layer, minlod, maxlod, bStatic);
                 index = this.pointcloudlayerlist.length;
                 this.pointcloudlayerlist.push(pcLayer);
                 this._UpdateLayers();
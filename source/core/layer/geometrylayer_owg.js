@@ -34,6 +34,8 @@ function owgGeometryLayer()
    this.curserver = 0;
    this.minlod = -1;
    this.maxlod = -1;
+   /** @type {?string} */
+   this.layer = null;             // layer name of a static tile pyramid
    
    //---------------------------------------------------------------------------
    this.Ready = function()
@@ -63,9 +65,22 @@ function owgGeometryLayer()
       var coords = new Array(4);
       var res = {};
       var extent;
-      this.quadtree.QuadKeyToWGS84(quadcode, coords);
-      extent="extent="+ coords[1]+","+coords[2]+","+coords[3]+","+coords[0];
-      var sFilename = this.servers[this.curserver] + "/?" + extent + "&format=owg";
+      var sFilename;
+      if (this.layer)
+      {
+         // static tiles written by geometry_tiler.py
+         this.quadtree.QuadKeyToTileCoord(quadcode, res);
+         sFilename = this.servers[this.curserver] + "/" + this.layer + "/tiles/" +
+                     res.lod + "/" +
+                     res.x + "/" +
+                     res.y + ".json";
+      }
+      else
+      {
+         this.quadtree.QuadKeyToWGS84(quadcode, coords);
+         extent="extent="+ coords[1]+","+coords[2]+","+coords[3]+","+coords[0];
+         sFilename = this.servers[this.curserver] + "/?" + extent + "&format=owg";
+      }
 
       // create geometry
       var GeometryBlock = new Geometry(engine);
@@ -114,11 +129,19 @@ function owgGeometryLayer()
    
    //---------------------------------------------------------------------------
    
-   this.Setup = function(servers, minlod, maxlod)
+   /**
+   * @param {Array.<string>} servers
+   * @param {number} minlod
+   * @param {number} maxlod
+   * @param {string=} opt_layer layer of a static tile pyramid (server/layer/tiles/lod/x/y.json),
+   *                  if not given the tiles are requested by extent from a geometry tile service
+   */
+   this.Setup = function(servers, minlod, maxlod, opt_layer)
    {
       this.servers = servers;
       this.minlod = minlod;
       this.maxlod = maxlod;
+      this.layer = opt_layer || null;
    }
 }
 
@@ -34,6 +34,8 @@ function owgPointCloudLayer()
     this.minlod = -1;
     this.maxlod = -1;
     this.maxpts = 40000;
+    /** @type {boolean} */
+    this.bStatic = false;          // static tile pyramid (server/layer/tiles/lod/x/y.bin)
 
     //---------------------------------------------------------------------------
     this.Ready = function()
@@ -65,9 +67,22 @@ function owgPointCloudLayer()
         var coords = new Array(4);
         var res = {};
         var extent;
-        this.quadtree.QuadKeyToWGS84(quadcode, coords);
-        extent="&lon0="+ coords[1]+"&lat0="+coords[2]+"&lon1="+coords[3]+"&lat1="+coords[0];
-        var sFilename = this.servers[this.curserver] + "?" + "layer=" + this.layer + extent + "&points=" + this.maxpts;
+        var sFilename;
+        if (this.bStatic)
+        {
+            // static tiles written by pointcloud_tiler.py
+            this.quadtree.QuadKeyToTileCoord(quadcode, res);
+            sFilename = this.servers[this.curserver] + "/" + this.layer + "/tiles/" +
+                        res.lod + "/" +
+                        res.x + "/" +
+                        res.y + ".bin";
+        }
+        else
+        {
+            this.quadtree.QuadKeyToWGS84(quadcode, coords);
+            extent="&lon0="+ coords[1]+"&lat0="+coords[2]+"&lon1="+coords[3]+"&lat1="+coords[0];
+            sFilename = this.servers[this.curserver] + "?" + "layer=" + this.layer + extent + "&points=" + this.maxpts;
+        }
 
         //console.log("RequestTile: " + quadcode);
 
@@ -118,12 +133,21 @@ function owgPointCloudLayer()
 
     //---------------------------------------------------------------------------
 
-    this.Setup = function(servers, layer, minlod, maxlod)
+    /**
+     * @param {Array.<string>} servers
+     * @param {string} layer
+     * @param {number} minlod
+     * @param {number} maxlod
+     * @param {boolean=} opt_bStatic if true the tiles are loaded from the static tile pyramid
+     *                   server/layer/tiles/lod/x/y.bin instead of the point cloud service
+     */
+    this.Setup = function(servers, layer, minlod, maxlod, opt_bStatic)
     {
         this.servers = servers;
         this.layer = layer;
         this.minlod = minlod;
         this.maxlod = maxlod;
+        this.bStatic = opt_bStatic || false;
     }
 }
 
@@ -201,6 +201,13 @@ ogSurface.prototype.ParseOptions = function(options)
       {
          this.surface.visibilityDistance = 50000*CARTESIAN_SCALE_INV; //default value for visibility.
       }
+      if(options["jsonobject"]["MinVisibilityDistance"])
+      {
+         this.surface.minVisibilityDistance = options["jsonobject"]["MinVisibilityDistance"]*CARTESIAN_SCALE_INV;
+      }else
+      {
+         this.surface.minVisibilityDistance = 0; //level of detail visible from any distance
+      }
    }   
 
    this.longitude = options["jsonobject"]["Center"][0];
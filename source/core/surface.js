@@ -14,7 +14,9 @@ goog.provide('owg.Surface');
 goog.require('goog.debug.Logger');
 goog.require('goog.json');
 goog.require('owg.AABB');
+goog.require('owg.DataView');
 goog.require('owg.TriangleIntersector');
+goog.require('owg.ViewFrustum');
 goog.require('owg.mat4');
 goog.require('owg.vec3');
 goog.require('owg.vec4');
@@ -37,9 +39,9 @@ var ObjectTerrainBlock;
 /**
  * @typedef {{
  *     IndexSemantic: string,
- *     Indices: Array.<number>,
+ *     Indices: (Array.<number>|Uint16Array),
  *     VertexSemantic: string,
- *     Vertices: Array.<number>
+ *     Vertices: (Array.<number>|Float32Array)
  * }}
  */
 var ObjectJSON;
@@ -90,6 +92,11 @@ var ObjectJSON;
  mySurface = new Surface(engine);
  mySurface.loadFromJSON("myGeometry.json");
 
+ // Example 3: load from binary geometry (documentation/Binary_Geometry.txt)
+
+ mySurface = new Surface(engine);
+ mySurface.loadFromBinary("myGeometry.bin");
+
  */
 //------------------------------------------------------------------------------
 /**
@@ -162,6 +169,10 @@ function Surface(engine)
    this.offset = null;
    /** @type {number} */
    this.curtainindex = 0;
+   /** @type {?Array.<Array.<number>>} */
+   this.clusters = null;         // [first index, number of indices, min x,y,z, max x,y,z] per cluster
+   /** @type {?ViewFrustum} */
+   this.frustum = null;          // frustum for the cluster test (in vertex coordinates)
 
    /** @type {AABB} */
    this.aabb = new AABB();
@@ -329,7 +340,7 @@ Surface.prototype.SetBufferPoi = function (poidata)
 //------------------------------------------------------------------------------
 /**
  * @description Specify a an index buffer with the specified index semantic
- * @param {Array} idx indices array.
+ * @param {Array|Uint16Array} idx indices array.
  * @param {string} idxsem supports "TRIANGLES","POINTS" or "LINES".
  */
 Surface.prototype.SetIndexBuffer = function (idx, idxsem)
@@ -566,6 +577,10 @@ Surface.prototype.Draw = function (opt_ranged, opt_count, opt_offset, opt_fontco
          {
             this.gl.drawElements(this.gl.TRIANGLES, count, this.gl.UNSIGNED_SHORT, offset);
          }
+         else if (this.clusters)
+         {
+            this._DrawClusters();
+         }
          else
          {
             this.gl.drawElements(this.gl.TRIANGLES, this.numindex, this.gl.UNSIGNED_SHORT, 0);
@@ -620,6 +635,48 @@ Surface.prototype.Draw = function (opt_ranged, opt_count, opt_offset, opt_fontco
    this.gl.disableVertexAttribArray(3);
 }
 //------------------------------------------------------------------------------
+/**
+ * @description Draws the clusters (documentation/JSON_Geometry.txt) inside the
+ * view frustum, neighbouring visible clusters with one call.
+ * @ignore
+ */
+Surface.prototype._DrawClusters = function ()
+{
+   if (this.frustum == null)
+   {
+      this.frustum = new ViewFrustum();
+   }
+   // the boxes are in vertex coordinates, so the model matrix is part of the test
+   this.frustum.Update(this.engine.matModelViewProjection);
+
+   var first = 0;
+   var count = 0;
+   for (var i = 0; i < this.clusters.length; i++)
+   {
+      var cluster = this.clusters[i];
+      if (this.frustum.TestBox(cluster[2], cluster[3], cluster[4], cluster[5], cluster[6], cluster[7]))
+      {
+         if (count > 0 && first + count == cluster[0])
+         {
+            count += cluster[1];
+         }
+         else
+         {
+            if (count > 0)
+            {
+               this.gl.drawElements(this.gl.TRIANGLES, count, this.gl.UNSIGNED_SHORT, first * 2);
+            }
+            first = cluster[0];
+            count = cluster[1];
+         }
+      }
+   }
+   if (count > 0)
+   {
+      this.gl.drawElements(this.gl.TRIANGLES, count, this.gl.UNSIGNED_SHORT, first * 2);
+   }
+}
+//------------------------------------------------------------------------------
 /**
  * @description Draws the Surface element using the p-shader
  * @param {null|boolean=} opt_ranged
@@ -802,6 +859,11 @@ Surface.prototype.CreateFromJSONObject = function (jsonobject, readycbf, failedc
       surface.curtainindex = jsonobject['CurtainIndex'];
    }
 
+   if (jsonobject['Clusters'])
+   {
+      surface.clusters = jsonobject['Clusters'];
+   }
+
    switch (jsonobject['VertexSemantic'])
    {
       case "p":
@@ -976,6 +1038,221 @@ Surface.prototype.loadFromJSON = function (url, opt_callbackready, opt_callbackf
    this.http.send();
 }
 //------------------------------------------------------------------------------
+/**
+ * @description download callback for binary geometry
+ * @ignore
+ */
+function _cbfbinarydownload(surface, e)
+{
+   if (e.target.status == 404)
+   {
+      _cbfbinaryfailed(surface);
+   }
+   else
+   {
+      surface.CreateFromBinary(e.target.response);
+   }
+}
+//------------------------------------------------------------------------------
+/**
+ * @description failed callback for binary geometry
+ * @ignore
+ */
+function _cbfbinaryfailed(surface)
+{
+   if (surface.cbf)
+   {
+      surface.cbf(surface);
+   }
+}
+//------------------------------------------------------------------------------
+/**
+ * @description Load surface-data from a binary geometry file.
+ * @param {string} url the url to the binary file.
+ * @param {function(Surface)=} opt_callbackready optional function called when surface finished download
+ * @param {function(Surface)=} opt_callbackfailed optional function called when surface failed download
+ */
+Surface.prototype.loadFromBinary = function (url, opt_callbackready, opt_callbackfailed)
+{
+   if (url == null)
+   {
+      alert("invalid binary-url");
+      return;
+   }
+
+   this.cbr = opt_callbackready;
+   this.cbf = opt_callbackfailed;
+
+   var me = this;
+   var _transferComplete = function(e) { _cbfbinarydownload(me, e); };
+   var _transferFailed = function(e) { _cbfbinaryfailed(me); };
+
+   // XMLHttpRequest for binary data:
+   var oReq = new window.XMLHttpRequest();
+   oReq.addEventListener("load", _transferComplete, false);
+   oReq.addEventListener("error", _transferFailed, false);
+
+   oReq.open("GET", url, true);
+
+   oReq.responseType = "arraybuffer";
+   oReq.send(null);
+}
+//------------------------------------------------------------------------------
+/**
+ * @description Creates the surface from binary geometry version 1.0 or 1.1. The
+ * vertex and index blocks of version 1.0 are mapped as Float32Array/Uint16Array
+ * views into the buffer, there is no per element parsing. The quantized
+ * vertices of version 1.1 are decoded with _DecodeQuantizedVertices.
+ * @param {ArrayBuffer} arraybuffer the binary geometry.
+ */
+Surface.prototype.CreateFromBinary = function (arraybuffer)
+{
+   var bytebuffer = new Uint8Array(arraybuffer); // currently required for browser compability...
+   var dv = new jDataView(bytebuffer, 0, bytebuffer.length, true);
+
+   var magic = dv.getString(4);
+   var majorversion = dv.getUint8();
+   var minorversion = dv.getUint8();
+   dv.skip(2);
+
+   if (magic != "OWGM" || majorversion != 1 || minorversion > 1)
+   {
+      goog.debug.Logger.getLogger('owg.Surface').warning("CreateFromBinary: unsupported binary geometry!");
+      _cbfbinaryfailed(this);
+      return;
+   }
+
+   var center = [dv.getFloat64(), dv.getFloat64(), dv.getFloat64()];
+   var numvertex = dv.getUint32();
+   var numindex = dv.getUint32();
+   var vertexsemantic = dv.getString(dv.getUint16());
+   var indexsemantic = dv.getString(dv.getUint16());
+   var diffusemap = dv.getString(dv.getUint16(), undefined, 'utf8');
+
+   var vertexlength = {"p" : 3, "pc" : 7, "pt" : 5, "pt_stereo" : 5, "pnt" : 8, "pnc" : 10, "pnct" : 12}[vertexsemantic];
+   if (!vertexlength)
+   {
+      goog.debug.Logger.getLogger('owg.Surface').warning("CreateFromBinary: unknown surface mode!");
+      _cbfbinaryfailed(this);
+      return;
+   }
+
+   // vertex block is aligned to 4 bytes
+   var offset = dv.tell();
+   offset += (4 - offset % 4) % 4;
+   var vertices;
+   if (minorversion == 1)
+   {
+      var result = {};
+      vertices = _DecodeQuantizedVertices(arraybuffer, offset, numvertex, vertexsemantic, vertexlength, result);
+      offset = result.offset;
+   }
+   else
+   {
+      vertices = new Float32Array(arraybuffer, offset, numvertex * vertexlength);
+      offset += 4 * numvertex * vertexlength;
+   }
+   var indices = new Uint16Array(arraybuffer, offset, numindex);
+
+   var jsonobject = {};
+   jsonobject['VertexSemantic'] = vertexsemantic;
+   jsonobject['Vertices'] = vertices;
+   jsonobject['IndexSemantic'] = indexsemantic;
+   jsonobject['Indices'] = indices;
+   jsonobject['Center'] = center;
+   jsonobject['DiffuseMap'] = diffusemap;
+
+   this.CreateFromJSONObject(/** @type {ObjectJSON} */ (jsonobject), null, null, this);
+}
+//------------------------------------------------------------------------------
+/**
+ * @description Decodes the quantized vertex blocks of binary geometry 1.1 to
+ * interleaved float vertices: int16 positions (offset + q * scale), octahedron
+ * encoded int8 normals, uint8 colors and uint16 texcoords, every block padded
+ * to 4 bytes.
+ * @param {ArrayBuffer} arraybuffer the binary geometry.
+ * @param {number} offset byte offset of the quantization parameters.
+ * @param {number} numvertex number of vertices.
+ * @param {string} vertexsemantic the vertex semantic.
+ * @param {number} vertexlength floats per vertex.
+ * @param {Object} result result.offset is set to the end of the vertex blocks.
+ * @return {Float32Array}
+ * @ignore
+ */
+function _DecodeQuantizedVertices(arraybuffer, offset, numvertex, vertexsemantic, vertexlength, result)
+{
+   var params = new Float32Array(arraybuffer, offset, 8);
+   var poffset = [params[0], params[1], params[2]];
+   var pscale = params[3];
+   var toffset = [params[4], params[5]];
+   var tscale = [params[6], params[7]];
+   offset += 32;
+
+   var vertices = new Float32Array(numvertex * vertexlength);
+   var i, k;
+
+   var positions = new Int16Array(arraybuffer, offset, 3 * numvertex);
+   offset += 4 * Math.ceil(6 * numvertex / 4);
+   for (i=0;i<numvertex;i++)
+   {
+      vertices[vertexlength*i+0] = poffset[0] + positions[3*i+0] * pscale;
+      vertices[vertexlength*i+1] = poffset[1] + positions[3*i+1] * pscale;
+      vertices[vertexlength*i+2] = poffset[2] + positions[3*i+2] * pscale;
+   }
+   var column = 3;
+
+   if (vertexsemantic.indexOf("n") >= 0)
+   {
+      var normals = new Int8Array(arraybuffer, offset, 2 * numvertex);
+      offset += 4 * Math.ceil(2 * numvertex / 4);
+      for (i=0;i<numvertex;i++)
+      {
+         var x = normals[2*i] / 127;
+         var y = normals[2*i+1] / 127;
+         var z = 1 - Math.abs(x) - Math.abs(y);
+         if (z < 0)
+         {
+            var tx = (1 - Math.abs(y)) * (x >= 0 ? 1 : -1);
+            y = (1 - Math.abs(x)) * (y >= 0 ? 1 : -1);
+            x = tx;
+         }
+         var len = Math.sqrt(x*x + y*y + z*z);
+         vertices[vertexlength*i+column+0] = x / len;
+         vertices[vertexlength*i+column+1] = y / len;
+         vertices[vertexlength*i+column+2] = z / len;
+      }
+      column += 3;
+   }
+
+   if (vertexsemantic.indexOf("c") >= 0)
+   {
+      var colors = new Uint8Array(arraybuffer, offset, 4 * numvertex);
+      offset += 4 * numvertex;
+      for (i=0;i<numvertex;i++)
+      {
+         for (k=0;k<4;k++)
+         {
+            vertices[vertexlength*i+column+k] = colors[4*i+k] / 255;
+         }
+      }
+      column += 4;
+   }
+
+   if (vertexsemantic.indexOf("t") >= 0)
+   {
+      var texcoords = new Uint16Array(arraybuffer, offset, 2 * numvertex);
+      offset += 4 * numvertex;
+      for (i=0;i<numvertex;i++)
+      {
+         vertices[vertexlength*i+column+0] = toffset[0] + texcoords[2*i+0] * tscale[0];
+         vertices[vertexlength*i+column+1] = toffset[1] + texcoords[2*i+1] * tscale[1];
+      }
+   }
+
+   result.offset = offset;
+   return vertices;
+}
+//------------------------------------------------------------------------------
 /**
  * @description Specify the function called as soon as the JSON File is fully loaded. This is optional.
  * @param {function()} f Callback Function which has "surface" as param.
@@ -1564,6 +1841,7 @@ Surface.prototype.CopyFrom = function (surface)
    this.ibo = surface.ibo;
    this.modelMatrix = surface.modelMatrix;
    this.indexsemantic = surface.indexsemantic;
+   this.clusters = surface.clusters;
 }
 //------------------------------------------------------------------------------
 /** @description Create a Solid Cube